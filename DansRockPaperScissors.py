@@ -1,18 +1,20 @@
+import time
+start_time = time.perf_counter()
 import tkinter as tk
-from PIL import Image, ImageTk
-import pygame
-import random
-import csv
 import os
 import json
-from datetime import datetime
-
-# Initialize pygame mixer
-try:
-    pygame.mixer.init()
-    print("Pygame mixer initialized.")
-except Exception as e:
-    print(f"Failed to initialize mixer: {e}")
+from rps_engine import Match, choices, modes
+from rps_ai import Predictor
+from rps_anim import Animator
+from rps_assets import AssetCache, SoundBank
+from rps_log import LogWriter, decode_record
+from rps_leaderboard import ALL_MODES
+from rps_profiles import DEFAULT_PROFILE, ProfileStore
+from rps_metrics import profiler, report_path, serve_env
+
+# Startup phases, round phases and screen builds are timed when RPS_PROFILE=1
+# (see rps_metrics.py); otherwise profiler calls do nothing.
+startup_clock = profiler.lap("startup.imports", start_time)
 
 # Tkinter setup
 root = tk.Tk()
@@ -23,6 +25,7 @@ root.geometry("600x500")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSETS = os.path.join(BASE_DIR, "assets")
 print(f"Asset path: {ASSETS}")
+startup_clock = profiler.lap("startup.tk", startup_clock)
 
 # Theme definitions
 themes = {
@@ -32,6 +35,7 @@ themes = {
         "buttons": {
             "easy": "#4CAF50",
             "hard": "#f44336",
+            "adaptive": "#3F51B5",
             "leaderboard": "#2196F3",
             "stats": "#FFC107",
             "reset": "#FF5722",
@@ -49,6 +53,7 @@ themes = {
         "buttons": {
             "easy": "#4CAF50",
             "hard": "#689F38",
+            "adaptive": "#33691E",
             "leaderboard": "#8BC34A",
             "stats": "#AED581",
             "reset": "#7CB342",
@@ -66,6 +71,7 @@ themes = {
         "buttons": {
             "easy": "#4FC3F7",
             "hard": "#0288D1",
+            "adaptive": "#00838F",
             "leaderboard": "#0277BD",
             "stats": "#4DD0E1",
             "reset": "#039BE5",
@@ -83,6 +89,7 @@ themes = {
         "buttons": {
             "easy": "#FF7043",
             "hard": "#D81B60",
+            "adaptive": "#AD1457",
             "leaderboard": "#F06292",
             "stats": "#FFCA28",
             "reset": "#F57C00",
@@ -100,6 +107,7 @@ themes = {
         "buttons": {
             "easy": "#00E676",
             "hard": "#FF1744",
+            "adaptive": "#D500F9",
             "leaderboard": "#00B0FF",
             "stats": "#CCCC00",
             "reset": "#FF9100",
@@ -113,173 +121,249 @@ themes = {
     }
 }
 
-# Load and save theme
-def load_theme():
-    config_path = os.path.join(BASE_DIR, "config.json")
-    try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
-            return config.get("theme", "Default")
-    except FileNotFoundError:
-        return "Default"
+# Load and save settings (theme and current player)
+CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
 
-def save_theme(theme_name):
-    config_path = os.path.join(BASE_DIR, "config.json")
+def load_config():
     try:
-        with open(config_path, "w") as f:
-            json.dump({"theme": theme_name}, f)
+        with open(CONFIG_PATH, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_config(**values):
+    config = load_config()
+    config.update(values)
+    try:
+        with open(CONFIG_PATH, "w") as f:
+            json.dump(config, f)
     except Exception as e:
-        print(f"Error saving theme: {e}")
+        print(f"Error saving config: {e}")
+
+def load_theme():
+    return load_config().get("theme", "Default")
+
+def save_theme(theme_name):
+    save_config(theme=theme_name)
 
 # Initialize theme
 current_theme = load_theme()
 root.configure(bg=themes[current_theme]["bg"])
 
-# Image and sound references
-image_refs = {}
+# Image and sound loading (processed copies are cached in asset_cache/)
+asset_cache = AssetCache(ASSETS, os.path.join(BASE_DIR, "asset_cache"))
 
 def load_image(name, size=None):
     try:
-        path = os.path.join(ASSETS, name)
-        print(f"Loading image from: {path}")
-        img = Image.open(path)
-        if size:
-            img = img.resize(size, Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(img)
-        image_refs[name] = photo
+        with profiler.timer("load_image"):
+            photo = asset_cache.image(name, size)
         print(f"Loaded image: {name}")
         return photo
     except Exception as e:
         print(f"Image load error: {name} → {e}")
         return None
 
-def load_sound(name):
-    try:
-        path = os.path.join(ASSETS, name)
-        print(f"Loading sound from: {path}")
-        return pygame.mixer.Sound(path)
-    except Exception as e:
-        print(f"Sound load error: {name} → {e}")
-        return None
-
-# Load images
+# Images are loaded on demand the first time a screen needs a size
 small_image_size = (80, 80)
 large_image_size = (120, 120)
-rock_img_small = load_image("rock.png", small_image_size)
-paper_img_small = load_image("paper.png", small_image_size)
-scissors_img_small = load_image("scissors.png", small_image_size)
-rock_img_large = load_image("rock.png", large_image_size)
-paper_img_large = load_image("paper.png", large_image_size)
-scissors_img_large = load_image("scissors.png", large_image_size)
-rock_img_anim = load_image("rock.png", (90, 90) if small_image_size == (80, 80) else (130, 130))
-paper_img_anim = load_image("paper.png", (90, 90) if small_image_size == (80, 80) else (130, 130))
-scissors_img_anim = load_image("scissors.png", (90, 90) if small_image_size == (80, 80) else (130, 130))
-
-images_small = {"rock": rock_img_small, "paper": paper_img_small, "scissors": scissors_img_small}
-images_large = {"rock": rock_img_large, "paper": paper_img_large, "scissors": scissors_img_large}
-images_anim = {"rock": rock_img_anim, "paper": paper_img_anim, "scissors": scissors_img_anim}
-
-# Load sounds
-click_sound = load_sound("click.mp3")
-win_sound = load_sound("win.wav")
-lose_sound = load_sound("lose.wav")
-draw_sound = load_sound("tie.aiff")
-bgm = load_sound("bgm.mp3")
+anim_image_size = (90, 90) if small_image_size == (80, 80) else (130, 130)
+
+image_sets = {}
+
+def load_images(size):
+    if size not in image_sets:
+        image_sets[size] = {choice: load_image(f"{choice}.png", size) for choice in choices}
+        asset_cache.save_index()
+    return image_sets[size]
+
+# Sounds load in the background (see SoundBank); effects are silent until ready
+sound_bank = SoundBank(asset_cache, {
+    "click": "click.mp3",
+    "You Win": "win.wav",
+    "You Lose": "lose.wav",
+    "Draw": "tie.aiff",
+}, music="bgm.mp3")
 
 # Background music control
-bgm_playing = False
-if bgm:
-    bgm.set_volume(0.5)
-    bgm.play(loops=-1)
-    bgm_playing = True
+# The music is requested now and starts once the mixer has loaded; until then
+# (or if it never starts) the menu offers to play it.
+bgm_playing = sound_bank.play_music()
+sound_bank.start()
+BGM_POLL_MS = 100
 
 # Game variables
-choices = ["rock", "paper", "scissors"]
-scores = {"player": 0, "computer": 0}
-win_streak = 0
-best_streak = 0
-mode = None
+# The match keeps its last rounds in a fixed-size buffer (see rps_history.py),
+# so memory stays flat however long a kiosk session runs.
+HISTORY_SIZE = 1024
+RECENT_ROUNDS = 8
+match = Match(history=HISTORY_SIZE)
 is_fullscreen = False
-power_up_active = False
-game_count = 0
 first_game = True
 
-# Game logic
-def get_computer_choice(player_choice):
-    if mode == "Easy":
-        return random.choice(choices)
-    else:
-        counter = {"rock": "paper", "paper": "scissors", "scissors": "rock"}
-        lose = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
-        return counter[player_choice] if random.random() < 0.66 else lose[player_choice]
-
-def get_result(p, c):
-    global win_streak, best_streak, power_up_active, game_count
-    game_count += 1
-    if p == c:
-        win_streak = 0
-        if draw_sound: draw_sound.play()
-        return "Draw"
-    elif (p == "rock" and c == "scissors") or (p == "paper" and c == "rock") or (p == "scissors" and c == "paper"):
-        scores["player"] += (2 if power_up_active else 1)
-        win_streak += 1
-        best_streak = max(best_streak, win_streak)
-        power_up_active = win_streak >= 3
-        if win_sound: win_sound.play()
-        return "You Win"
-    else:
-        scores["computer"] += 1
-        win_streak = 0
-        power_up_active = False
-        if lose_sound: lose_sound.play()
-        return "You Lose"
+# Player profiles (see rps_profiles.py): each player's log, stats and
+# leaderboard live in profiles/<name>/. A log from before profiles is moved
+# into the default profile once.
+PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
+LEADERBOARD_SIZE = 5
+profile_store = ProfileStore(PROFILES_DIR, LEADERBOARD_SIZE)
+profile_store.migrate(BASE_DIR)
+profile_name = load_config().get("profile", DEFAULT_PROFILE)
+try:
+    profile = profile_store.open(profile_name)
+except Exception as e:
+    print(f"Error opening profile {profile_name}: {e}")
+    profile = profile_store.open(DEFAULT_PROFILE)
+# Computer moves come from the profile's seeded session (see rps_replay.py).
+match.rng = profile.start_session()
+startup_clock = profiler.lap("startup.profile_open", startup_clock)
+
+# Rounds are written by a background thread in batches; stats and leaderboard
+# are updated and saved on that thread once their rounds are on disk.
+LOG_BATCH_SIZE = 64
+LOG_MAX_DELAY = 1.0
+LOG_FSYNC_EVERY = 0
+
+def commit_summaries(player, records):
+    with profiler.timer("log.commit_summaries"):
+        try:
+            player.commit(records)
+        except Exception as e:
+            print(f"Error saving stats: {e}")
+
+def make_log_writer(player):
+    return LogWriter(player.log, LOG_BATCH_SIZE, LOG_MAX_DELAY, LOG_FSYNC_EVERY,
+                     on_commit=lambda records: commit_summaries(player, records), on_rotate=player.rotated)
+
+log_writer = make_log_writer(profile)
 
 def log_game(p, c, result):
-    log_path = os.path.join(BASE_DIR, "game_log.csv")
-    with open(log_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if f.tell() == 0:
-            writer.writerow(["Timestamp", "Player", "Computer", "Result", "Mode", "Player Score", "Computer Score", "Streak"])
-        writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), p, c, result, mode, scores["player"], scores["computer"], win_streak])
-
-def read_game_log():
-    log_path = os.path.join(BASE_DIR, "game_log.csv")
-    games = []
+    log_writer.append(p, c, result, match.mode, match.scores["player"], match.scores["computer"], match.win_streak)
+
+def switch_profile(name):
+    # The old writer is closed (and its rounds committed) before the new
+    # profile is opened, so rounds always land in the right shard.
+    global profile, log_writer, first_game
+    log_writer.close()
     try:
-        with open(log_path, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                games.append(row)
-    except FileNotFoundError:
-        return []
-    return games
+        profile = profile_store.open(name)
+    except Exception as e:
+        print(f"Error opening profile {name}: {e}")
+        profile = profile_store.open(profile.name)
+    log_writer = make_log_writer(profile)
+    save_config(profile=profile.name)
+    match.reset()
+    match.ai = None
+    match.rng = profile.start_session()
+    first_game = True
+    profile_button.configure(text=f"👤 {profile.name}")
 
 def reset_game():
-    global scores, win_streak, best_streak, game_count, power_up_active, first_game
-    scores = {"player": 0, "computer": 0}
-    win_streak = 0
-    best_streak = 0
-    game_count = 0
-    power_up_active = False
+    global first_game
+    match.reset()
+    match.ai = None
     first_game = True
-    log_path = os.path.join(BASE_DIR, "game_log.csv")
+    log_writer.flush()
     try:
-        with open(log_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Timestamp", "Player", "Computer", "Result", "Mode", "Player Score", "Computer Score", "Streak"])
-        print("Game log reset.")
+        # Only the current player's shard is touched; a new session seed is drawn.
+        profile.reset()
+        match.rng = profile.start_session()
+        print(f"Game log reset for {profile.name}.")
     except Exception as e:
         print(f"Error resetting game log: {e}")
-    if mode:
+    show_current_screen()
+
+def back_to_menu():
+    log_writer.flush()
+    show_main_menu()
+
+def quit_game():
+    log_writer.close()
+    if profiler.enabled:
+        try:
+            profiler.dump(report_path)
+            print(f"Latency report written to {report_path}")
+        except Exception as e:
+            print(f"Error writing profile: {e}")
+        profiler.close()
+    root.quit()
+
+# UI functions
+# Screens are built once, the first time they are shown, and stacked in the same
+# grid cell, so switching screens only raises a frame. Widgets register how they
+# follow the theme (themed) and the window size (responsive); theme and layout
+# changes then reconfigure the existing widgets instead of rebuilding them.
+screens = {}
+current_screen = None
+themed_widgets = []
+layout_setters = []
+layout_callbacks = []
+layout_job = None
+LAYOUT_DEBOUNCE_MS = 100
+
+root.grid_rowconfigure(0, weight=1)
+root.grid_columnconfigure(0, weight=1)
+
+def theme_style(role):
+    theme = themes[current_theme]
+    if callable(role):
+        return role(theme)
+    if role == "frame":
+        return {"bg": theme["bg"]}
+    if role == "text":
+        return {"fg": theme["fg"], "bg": theme["bg"]}
+    if role in ("highlight", "power_up"):
+        return {"fg": theme[role], "bg": theme["bg"]}
+    return {"bg": theme["buttons"][role], "fg": theme["fg"]}
+
+def themed(widget, role="text"):
+    themed_widgets.append((widget, role))
+    widget.configure(**theme_style(role))
+    return widget
+
+def apply_theme_to_widgets():
+    root.configure(bg=themes[current_theme]["bg"])
+    for widget, role in themed_widgets:
+        widget.configure(**theme_style(role))
+
+def fonts(normal, fullscreen, *style):
+    return (("Helvetica", normal) + style, ("Helvetica", fullscreen) + style)
+
+def responsive(setter, **options):
+    # Each option is a (normal, fullscreen) pair; setter is a widget's
+    # configure, pack_configure or grid_configure.
+    layout_setters.append((setter, options))
+    setter(**{key: value[is_fullscreen] for key, value in options.items()})
+
+def apply_layout():
+    started = profiler.clock()
+    for setter, options in layout_setters:
+        setter(**{key: value[is_fullscreen] for key, value in options.items()})
+    for callback in layout_callbacks:
+        callback()
+    profiler.lap("screen.layout", started)
+
+def show_screen(name, build, refresh=None):
+    global current_screen
+    if name not in screens:
+        with profiler.timer(f"screen.build.{name}"):
+            screens[name] = build()
+            screens[name].grid(row=0, column=0, sticky="nsew")
+    if refresh:
+        with profiler.timer(f"screen.refresh.{name}"):
+            refresh()
+    screens[name].tkraise()
+    current_screen = name
+    if name == "game":
+        root.bind("<KeyPress>", handle_key)
+    else:
+        root.unbind("<KeyPress>")
+
+def show_current_screen():
+    if match.mode:
         show_game_screen()
     else:
         show_main_menu()
 
-# UI functions
-def clear_screen():
-    for widget in root.winfo_children():
-        widget.destroy()
-
 def show_input_popup():
     global first_game
     if not first_game:
@@ -316,10 +400,7 @@ def show_theme_selector():
         current_theme = theme_name
         save_theme(theme_name)
         popup.destroy()
-        if mode:
-            show_game_screen()
-        else:
-            show_main_menu()
+        apply_theme_to_widgets()
 
     for i, (theme_name, theme) in enumerate(themes.items()):
         tk.Button(frame, text=theme_name, font=("Helvetica", 12), bg=theme["bg"], fg=theme["fg"],
@@ -331,238 +412,431 @@ def show_theme_selector():
     y = root.winfo_y() + (root.winfo_height() - popup.winfo_height()) // 2
     popup.geometry(f"+{x}+{y}")
 
-def show_main_menu():
-    clear_screen()
-    root.unbind("<KeyPress>")
-    root.configure(bg=themes[current_theme]["bg"])
-    font_size = 24 if is_fullscreen else 20
-    pady_val = 40 if is_fullscreen else 30
-    tk.Label(root, text="🎮 Rock Paper Scissors 🎮", font=("Helvetica", font_size, "bold"), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).pack(pady=pady_val)
+def show_profile_selector():
+    popup = tk.Toplevel(root)
+    popup.title("Select Player")
+    popup.geometry("400x360")
+    popup.configure(bg=themes[current_theme]["bg"])
+    popup.transient(root)
+    popup.grab_set()
+    tk.Label(popup, text="👤 Choose Player 👤", font=("Helvetica", 14, "bold"), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).pack(pady=10)
 
-    frame = tk.Frame(root, bg=themes[current_theme]["bg"])
-    frame.pack(pady=20)
+    frame = tk.Frame(popup, bg=themes[current_theme]["bg"])
+    frame.pack(pady=10)
+
+    def choose(name):
+        popup.destroy()
+        if name and name != profile.name:
+            switch_profile(name)
+
+    for i, name in enumerate(profile_store.names()):
+        color = themes[current_theme]["buttons"]["leaderboard" if name == profile.name else "theme"]
+        tk.Button(frame, text=name, font=("Helvetica", 12), bg=color, fg=themes[current_theme]["fg"],
+                  command=lambda n=name: choose(n)).grid(row=i, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
 
-    btn_width = 20 if is_fullscreen else 15
-    btn_font = ("Helvetica", 16 if is_fullscreen else 14)
-    padx_val = 15 if is_fullscreen else 10
-    pady_val = 15 if is_fullscreen else 10
+    new_name = tk.Entry(frame, font=("Helvetica", 12))
+    new_name.grid(row=len(profile_store.names()), column=0, padx=10, pady=5)
+    tk.Button(frame, text="➕ New", font=("Helvetica", 12), bg=themes[current_theme]["buttons"]["easy"], fg=themes[current_theme]["fg"],
+              command=lambda: choose(new_name.get().strip())).grid(row=len(profile_store.names()), column=1, pady=5)
 
-    tk.Button(frame, text="😊 Easy Mode", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["easy"], fg=themes[current_theme]["fg"],
-              command=lambda: start_game("Easy")).grid(row=0, column=0, padx=padx_val, pady=pady_val)
-    tk.Button(frame, text="😈 Hard Mode", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["hard"], fg=themes[current_theme]["fg"],
-              command=lambda: start_game("Hard")).grid(row=0, column=1, padx=padx_val, pady=pady_val)
+    tk.Button(popup, text="Cancel", font=("Helvetica", 12), bg=themes[current_theme]["buttons"]["back"], fg=themes[current_theme]["fg"], command=popup.destroy).pack(pady=10)
+    popup.update()
+    x = root.winfo_x() + (root.winfo_width() - popup.winfo_width()) // 2
+    y = root.winfo_y() + (root.winfo_height() - popup.winfo_height()) // 2
+    popup.geometry(f"+{x}+{y}")
 
-    tk.Button(frame, text="🏆 Leaderboard", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["leaderboard"], fg=themes[current_theme]["fg"],
-              command=show_leaderboard).grid(row=1, column=0, padx=padx_val, pady=pady_val)
-    tk.Button(frame, text="📊 Stats", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["stats"], fg=themes[current_theme]["fg"],
-              command=show_stats).grid(row=1, column=1, padx=padx_val, pady=pady_val)
+def screen_title(parent, text, pady):
+    label = themed(tk.Label(parent, text=text))
+    label.pack()
+    responsive(label.configure, font=fonts(20, 24, "bold"))
+    responsive(label.pack_configure, pady=pady)
+    return label
+
+def back_button(parent):
+    btn = themed(tk.Button(parent, text="🔙 Back to Menu", command=back_to_menu), "back")
+    btn.pack(pady=20)
+    responsive(btn.configure, font=fonts(12, 14))
+    return btn
+
+# Main menu
+bgm_button = None
+profile_button = None
+
+def build_main_menu():
+    global bgm_button, profile_button
+    screen = themed(tk.Frame(root), "frame")
+    screen_title(screen, "🎮 Rock Paper Scissors 🎮", (30, 40))
+
+    frame = themed(tk.Frame(screen), "frame")
+    frame.pack(pady=20)
 
-    tk.Button(frame, text="🔄 Reset Game", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["reset"], fg=themes[current_theme]["fg"],
-              command=reset_game).grid(row=2, column=0, padx=padx_val, pady=pady_val)
-    tk.Button(frame, text="🔊 Play BGM" if not bgm_playing else "🔇 Mute BGM", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["bgm"], fg=themes[current_theme]["fg"],
-              command=toggle_bgm).grid(row=2, column=1, padx=padx_val, pady=pady_val)
+    def menu_button(parent, text, key, command):
+        btn = themed(tk.Button(parent, text=text, command=command), key)
+        responsive(btn.configure, font=fonts(14, 16), width=(15, 20))
+        return btn
+
+    buttons = [
+        (menu_button(frame, "😊 Easy Mode", "easy", lambda: start_game("Easy")), 0, 0, 1),
+        (menu_button(frame, "😈 Hard Mode", "hard", lambda: start_game("Hard")), 0, 1, 1),
+        (menu_button(frame, "🏆 Leaderboard", "leaderboard", show_leaderboard), 1, 0, 1),
+        (menu_button(frame, "📊 Stats", "stats", show_stats), 1, 1, 1),
+        (menu_button(frame, "🔄 Reset Game", "reset", reset_game), 2, 0, 1),
+        (menu_button(frame, "🔊 Play BGM" if not bgm_playing else "🔇 Mute BGM", "bgm", toggle_bgm), 2, 1, 1),
+        (menu_button(frame, "🧠 Adaptive Mode", "adaptive", lambda: start_game("Adaptive")), 3, 0, 2),
+    ]
+    for btn, row, column, columnspan in buttons:
+        btn.grid(row=row, column=column, columnspan=columnspan)
+        responsive(btn.grid_configure, padx=(10, 15), pady=(10, 15))
+    bgm_button = buttons[5][0]
 
-    theme_frame = tk.Frame(root, bg=themes[current_theme]["bg"])
+    theme_frame = themed(tk.Frame(screen), "frame")
     theme_frame.pack(pady=10)
-    tk.Button(theme_frame, text="🎨 Change Theme", font=btn_font, width=btn_width, bg=themes[current_theme]["buttons"]["theme"], fg=themes[current_theme]["fg"],
-              command=show_theme_selector).pack()
+    menu_button(theme_frame, "🎨 Change Theme", "theme", show_theme_selector).pack(side="left", padx=5)
+    profile_button = menu_button(theme_frame, f"👤 {profile.name}", "theme", show_profile_selector)
+    profile_button.pack(side="left", padx=5)
 
-    tk.Button(root, text="❌ Quit", font=("Helvetica", 14 if is_fullscreen else 12), width=10, bg=themes[current_theme]["buttons"]["quit"], fg=themes[current_theme]["fg"],
-              command=root.quit).pack(pady=10)
+    quit_button = themed(tk.Button(screen, text="❌ Quit", width=10, command=quit_game), "quit")
+    quit_button.pack(pady=10)
+    responsive(quit_button.configure, font=fonts(12, 14))
+    return screen
+
+def show_main_menu():
+    show_screen("menu", build_main_menu)
 
 def toggle_bgm():
     global bgm_playing
-    if bgm:
-        if bgm_playing:
-            bgm.stop()
-            bgm_playing = False
+    if bgm_playing:
+        sound_bank.stop_music()
+        bgm_playing = False
+    else:
+        bgm_playing = sound_bank.play_music()
+    update_bgm_button()
+
+def update_bgm_button():
+    if bgm_button is not None:
+        bgm_button.configure(text="🔊 Play BGM" if not bgm_playing else "🔇 Mute BGM")
+
+def sync_bgm():
+    # Polled from Tk until the sound loader finishes, since music started (or
+    # failed) on the loader thread.
+    global bgm_playing
+    if not sound_bank.ready.is_set():
+        root.after(BGM_POLL_MS, sync_bgm)
+        return
+    bgm_playing = sound_bank.music_playing
+    update_bgm_button()
+
+# Leaderboard
+# "Everyone" merges the top streaks of all players; the other boards are the
+# current player's.
+EVERYONE = "Everyone"
+leaderboard_board = ALL_MODES
+leaderboard_rows = []
+board_buttons = []
+
+def build_leaderboard():
+    screen = themed(tk.Frame(root), "frame")
+    screen_title(screen, "🏆 Leaderboard 🏆", (10, 20))
+
+    board_frame = themed(tk.Frame(screen), "frame")
+    board_frame.pack()
+    for name in [ALL_MODES] + modes + [EVERYONE]:
+        role = lambda theme, b=name: {"bg": theme["buttons"]["leaderboard"] if b == leaderboard_board else theme["buttons"]["back"],
+                                      "fg": theme["fg"]}
+        btn = themed(tk.Button(board_frame, text=name, width=8, command=lambda b=name: show_leaderboard(b)), role)
+        board_buttons.append((btn, role))
+        btn.pack(side="left", padx=5)
+        responsive(btn.configure, font=fonts(10, 12))
+
+    frame = themed(tk.Frame(screen), "frame")
+    frame.pack(pady=10)
+    header = themed(tk.Label(frame, text="Date | Player | Comp. | Result | Mode | Score | Streak"))
+    header.grid(row=0, column=0, pady=5)
+    responsive(header.configure, font=fonts(10, 12))
+    for i in range(1, LEADERBOARD_SIZE + 1):
+        row = themed(tk.Label(frame, text=""))
+        row.grid(row=i, column=0, pady=2)
+        responsive(row.configure, font=fonts(8, 10))
+        leaderboard_rows.append(row)
+
+    back_button(screen)
+    return screen
+
+def refresh_leaderboard():
+    if leaderboard_board == EVERYONE:
+        top_games = [(name + " | ", decode_record(record)) for name, record in profile_store.top(ALL_MODES, profile)]
+    else:
+        with profile.lock:
+            top = profile.leaderboard.top(leaderboard_board)
+        top_games = [("", decode_record(record)) for record in top]
+    for i, row in enumerate(leaderboard_rows):
+        if i < len(top_games):
+            name, game = top_games[i]
+            row.configure(text=f"{name}{game['Timestamp']} | {game['Player']} | {game['Computer']} | {game['Result']} | {game['Mode']} | {game['Player Score']}-{game['Computer Score']} | {game['Streak']}")
         else:
-            bgm.play(loops=-1)
-            bgm_playing = True
-    show_main_menu()
+            row.configure(text="")
+    for btn, role in board_buttons:
+        btn.configure(**theme_style(role))
 
-def show_leaderboard():
-    clear_screen()
-    root.unbind("<KeyPress>")
-    root.configure(bg=themes[current_theme]["bg"])
-    font_size = 24 if is_fullscreen else 20
-    pady_val = 20 if is_fullscreen else 10
-    tk.Label(root, text="🏆 Leaderboard 🏆", font=("Helvetica", font_size, "bold"), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).pack(pady=pady_val)
+def show_leaderboard(board=ALL_MODES):
+    global leaderboard_board
+    leaderboard_board = board
+    show_screen("leaderboard", build_leaderboard, refresh_leaderboard)
 
-    games = read_game_log()
-    games.sort(key=lambda x: int(x["Streak"]), reverse=True)
-    top_games = games[:5]
+# Stats
+stats_labels = []
 
-    frame = tk.Frame(root, bg=themes[current_theme]["bg"])
-    frame.pack(pady=10)
-    tk.Label(frame, text="Date | Player | Comp. | Result | Mode | Score | Streak", font=("Helvetica", 12 if is_fullscreen else 10),
-             fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).grid(row=0, column=0, pady=5)
-    for i, game in enumerate(top_games, 1):
-        text = f"{game['Timestamp']} | {game['Player']} | {game['Computer']} | {game['Result']} | {game['Mode']} | {game['Player Score']}-{game['Computer Score']} | {game['Streak']}"
-        tk.Label(frame, text=text, font=("Helvetica", 10 if is_fullscreen else 8), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).grid(row=i, column=0, pady=2)
+def build_stats():
+    screen = themed(tk.Frame(root), "frame")
+    screen_title(screen, "📊 Game Stats 📊", (10, 20))
 
-    tk.Button(root, text="🔙 Back to Menu", font=("Helvetica", 14 if is_fullscreen else 12), bg=themes[current_theme]["buttons"]["back"], fg=themes[current_theme]["fg"],
-              command=show_main_menu).pack(pady=20)
+    frame = themed(tk.Frame(screen), "frame")
+    frame.pack(pady=10)
+    for i in range(6):
+        label = themed(tk.Label(frame, text=""))
+        label.grid(row=i, column=0, pady=2)
+        responsive(label.configure, font=fonts(10, 12))
+        stats_labels.append(label)
+
+    back_button(screen)
+    return screen
+
+def refresh_stats():
+    # The log writer thread updates the stats; read them in one consistent piece.
+    game_stats = profile.stats
+    with profile.lock:
+        stats = [
+            f"Player: {profile.name}",
+            f"Total Games: {game_stats.total_games}",
+            f"Wins: {game_stats.wins} ({game_stats.win_rate:.1f}%)",
+            f"Losses: {game_stats.losses}",
+            f"Draws: {game_stats.draws}",
+            f"Favorite Choice: {game_stats.favorite_choice.capitalize()}"
+        ]
+    for label, stat in zip(stats_labels, stats):
+        label.configure(text=stat)
 
 def show_stats():
-    clear_screen()
-    root.unbind("<KeyPress>")
-    root.configure(bg=themes[current_theme]["bg"])
-    font_size = 24 if is_fullscreen else 20
-    pady_val = 20 if is_fullscreen else 10
-    tk.Label(root, text="📊 Game Stats 📊", font=("Helvetica", font_size, "bold"), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).pack(pady=pady_val)
-
-    games = read_game_log()
-    total_games = len(games)
-    wins = sum(1 for g in games if g["Result"] == "You Win")
-    losses = sum(1 for g in games if g["Result"] == "You Lose")
-    draws = sum(1 for g in games if g["Result"] == "Draw")
-    choices_made = [g["Player"] for g in games]
-    favorite_choice = max(set(choices_made), key=choices_made.count, default="None") if choices_made else "None"
-    win_rate = (wins / total_games * 100) if total_games > 0 else 0
-
-    frame = tk.Frame(root, bg=themes[current_theme]["bg"])
-    frame.pack(pady=10)
-    stats = [
-        f"Total Games: {total_games}",
-        f"Wins: {wins} ({win_rate:.1f}%)",
-        f"Losses: {losses}",
-        f"Draws: {draws}",
-        f"Favorite Choice: {favorite_choice.capitalize()}"
-    ]
-    for i, stat in enumerate(stats):
-        tk.Label(frame, text=stat, font=("Helvetica", 12 if is_fullscreen else 10), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).grid(row=i, column=0, pady=2)
+    show_screen("stats", build_stats, refresh_stats)
+
+# Game screen
+game_widgets = {}
+images = {}
+choice_buttons = {}
+
+def update_choice_images():
+    images.update(load_images(large_image_size if is_fullscreen else small_image_size))
+    for choice, btn in choice_buttons.items():
+        if images[choice]:
+            btn.configure(image=images[choice], text="")
+        else:
+            btn.configure(image="", text=choice.capitalize())
 
-    tk.Button(root, text="🔙 Back to Menu", font=("Helvetica", 14 if is_fullscreen else 12), bg=themes[current_theme]["buttons"]["back"], fg=themes[current_theme]["fg"],
-              command=show_main_menu).pack(pady=20)
+# Animations and input share one frame-capped scheduler (see rps_anim.py).
+ANIMATION_FPS = 60
+animator = Animator(root, ANIMATION_FPS)
+in_round = False
 
-def show_game_screen():
-    clear_screen()
-    root.configure(bg=themes[current_theme]["bg"])
-    images = images_large if is_fullscreen else images_small
-    images_anim_choice = images_anim
-    font_size_large = 18 if is_fullscreen else 16
-    font_size_small = 16 if is_fullscreen else 14
-    pady_val = 15 if is_fullscreen else 10
+def build_game_screen():
+    screen = themed(tk.Frame(root), "frame")
+    images_anim_choice = load_images(anim_image_size)
     padx_val = 10
 
-    show_input_popup()
+    main_frame = themed(tk.Frame(screen), "frame")
+    main_frame.pack(expand=True, fill="both")
+    responsive(main_frame.pack_configure, pady=(10, 15))
 
-    main_frame = tk.Frame(root, bg=themes[current_theme]["bg"])
-    main_frame.pack(expand=True, fill="both", pady=pady_val)
-
-    tk.Label(main_frame, text=f"Mode: {mode}", font=("Helvetica", font_size_large), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"]).pack(pady=pady_val)
-    score_label = tk.Label(main_frame, text=f"Player: {scores['player']}  Computer: {scores['computer']}",
-                           font=("Helvetica", font_size_large), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"])
+    mode_label = themed(tk.Label(main_frame, text=""))
+    mode_label.pack()
+    responsive(mode_label.configure, font=fonts(16, 18))
+    responsive(mode_label.pack_configure, pady=(10, 15))
+    score_label = themed(tk.Label(main_frame, text=""))
     score_label.pack()
+    responsive(score_label.configure, font=fonts(16, 18))
 
-    streak_label = tk.Label(main_frame, text=f"Streak: {win_streak}  Best: {best_streak}", font=("Helvetica", font_size_small),
-                            fg=themes[current_theme]["highlight"], bg=themes[current_theme]["bg"])
+    streak_label = themed(tk.Label(main_frame, text=""), "highlight")
     streak_label.pack()
+    responsive(streak_label.configure, font=fonts(14, 16))
 
-    power_up_label = tk.Label(main_frame, text="⚡ Power-Up Active!" if power_up_active else "", font=("Helvetica", font_size_small),
-                              fg=themes[current_theme]["power_up"], bg=themes[current_theme]["bg"])
+    power_up_label = themed(tk.Label(main_frame, text=""), "power_up")
     power_up_label.pack()
+    responsive(power_up_label.configure, font=fonts(14, 16))
+
+    recent_label = themed(tk.Label(main_frame, text=""))
+    recent_label.pack()
+    responsive(recent_label.configure, font=fonts(12, 14))
 
-    result_images_frame = tk.Frame(main_frame, bg=themes[current_theme]["bg"])
-    result_images_frame.pack(pady=pady_val, fill="x")
+    result_images_frame = themed(tk.Frame(main_frame), "frame")
+    result_images_frame.pack(fill="x")
+    responsive(result_images_frame.pack_configure, pady=(10, 15))
 
-    player_img_label = tk.Label(result_images_frame, bg=themes[current_theme]["bg"])
+    player_img_label = themed(tk.Label(result_images_frame), "frame")
     player_img_label.pack(side="left", padx=padx_val, expand=True)
 
-    vs_label = tk.Label(result_images_frame, text="VS", font=("Helvetica", 24 if is_fullscreen else 20, "bold"),
-                        fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"])
+    vs_label = themed(tk.Label(result_images_frame, text="VS"))
     vs_label.pack(side="left", expand=True)
+    responsive(vs_label.configure, font=fonts(20, 24, "bold"))
 
-    computer_img_label = tk.Label(result_images_frame, bg=themes[current_theme]["bg"])
+    computer_img_label = themed(tk.Label(result_images_frame), "frame")
     computer_img_label.pack(side="left", padx=padx_val, expand=True)
 
-    result_label = tk.Label(main_frame, text="", font=("Helvetica", 20 if is_fullscreen else 18), fg=themes[current_theme]["fg"], bg=themes[current_theme]["bg"])
-    result_label.pack(pady=pady_val)
+    result_label = themed(tk.Label(main_frame, text=""))
+    result_label.pack()
+    responsive(result_label.configure, font=fonts(18, 20))
+    responsive(result_label.pack_configure, pady=(10, 15))
 
-    choice_frame = tk.Frame(main_frame, bg=themes[current_theme]["bg"])
-    choice_frame.pack(pady=pady_val, fill="x")
+    choice_frame = themed(tk.Frame(main_frame), "frame")
+    choice_frame.pack(fill="x")
+    responsive(choice_frame.pack_configure, pady=(10, 15))
 
-    def animate_button(btn, choice, callback):
-        btn.config(image=images_anim_choice[choice])
-        root.after(200, lambda: btn.config(image=images[choice]))
-        callback()
+    def animate_button(btn, choice):
+        if images_anim_choice[choice]:
+            animator.play((btn, "press"), [(0, lambda: btn.config(image=images_anim_choice[choice])),
+                                           (200, lambda: btn.config(image=images[choice] or ""))])
 
     def animate_choice_labels():
-        def shake(label, count=3):
-            if count == 0:
-                label.configure(padx=padx_val, pady=pady_val)
-                return
-            label.configure(padx=padx_val + (5 if count % 2 else -5), pady=pady_val)
-            root.after(50, lambda: shake(label, count - 1))
-        shake(player_img_label)
-        shake(computer_img_label)
-
-    def make_choice(player_choice):
-        if click_sound:
-            click_sound.play()
-        computer_choice = get_computer_choice(player_choice)
-        result = get_result(player_choice, computer_choice)
-
-        if images[player_choice]:
-            player_img_label.config(image=images[player_choice])
-            player_img_label.image = images[player_choice]
-        else:
-            player_img_label.config(image="", text=player_choice.capitalize(), fg=themes[current_theme]["fg"], font=("Helvetica", font_size_small))
-
-        if images[computer_choice]:
-            computer_img_label.config(image=images[computer_choice])
-            computer_img_label.image = images[computer_choice]
+        pady_val = 15 if is_fullscreen else 10
+        for label in (player_img_label, computer_img_label):
+            animator.play((label, "shake"), [(i * 50, lambda l=label, o=offset: l.configure(padx=padx_val + o, pady=pady_val))
+                                             for i, offset in enumerate((5, -5, 5, 0))])
+
+    def show_choice(label, choice):
+        if images[choice]:
+            label.config(image=images[choice], text="")
         else:
-            computer_img_label.config(image="", text=computer_choice.capitalize(), fg=themes[current_theme]["fg"], font=("Helvetica", font_size_small))
+            label.config(image="", text=choice.capitalize(), fg=themes[current_theme]["fg"], font=("Helvetica", 16 if is_fullscreen else 14))
+
+    clicked = None
+
+    def stamp_click(event):
+        # Tk runs this before the button's command, which gets no event.
+        nonlocal clicked
+        clicked = profiler.event_clock(event.time)
+
+    def choose(choice, started=None):
+        # Input is applied on the next animation frame, one round per frame at
+        # most; presses before then replace the pending one, so a held key
+        # cannot queue up rounds. `started` is when the key or click event
+        # happened, so round.input includes the time spent in Tk's queue.
+        nonlocal clicked
+        if started is None:
+            started = clicked if clicked is not None else profiler.clock()
+        clicked = None
+        animator.play("input", [(0, lambda: make_choice(choice, started))])
+
+    def make_choice(player_choice, started):
+        # Phases: input (from the key or click to the frame), computer choice, result, sounds,
+        # widget updates, log; round.redraw runs once Tk is idle again.
+        global in_round
+        if in_round:
+            return
+        in_round = True
+        try:
+            play_round(player_choice, started)
+        finally:
+            in_round = False
+
+    def play_round(player_choice, started):
+        clock = profiler.lap("round.input", started)
+        animate_button(choice_buttons[player_choice], player_choice)
+        sound_bank.play("click")
+        computer_choice = match.get_computer_choice(player_choice)
+        clock = profiler.lap("round.make_choice", clock)
+        result = match.get_result(player_choice, computer_choice)
+        clock = profiler.lap("round.get_result", clock)
+        sound_bank.play(result)
+        clock = profiler.lap("round.sound", clock)
+
+        show_choice(player_img_label, player_choice)
+        show_choice(computer_img_label, computer_choice)
 
         animate_choice_labels()
         result_label.config(text=result)
-        score_label.config(text=f"Player: {scores['player']}  Computer: {scores['computer']}")
-        streak_label.config(text=f"Streak: {win_streak}  Best: {best_streak}")
-        power_up_label.config(text="⚡ Power-Up Active!" if power_up_active else "")
+        update_score_labels()
+        clock = profiler.lap("round.widgets", clock)
         log_game(player_choice, computer_choice, result)
+        profiler.lap("round.log_game", clock)
+        if profiler.enabled:
+            profiler.lap("round.total", started)
+            root.after_idle(lambda: profiler.lap("round.redraw", started))
 
-    choice_buttons = {}
     for choice in choices:
-        if images[choice] is not None:
-            btn = tk.Button(choice_frame, image=images[choice], bg=themes[current_theme]["bg"], bd=0)
-            btn.image = images[choice]
-            btn.config(command=lambda c=choice, b=btn: animate_button(b, c, lambda: make_choice(c)))
-            btn.pack(side="left", padx=padx_val, expand=True)
-            choice_buttons[choice] = btn
-        else:
-            print(f"Image for '{choice}' is not loaded.")
-
-    def handle_key(event):
-        key = event.keysym.lower()
-        key_to_choice = {"r": "rock", "s": "scissors", "p": "paper"}
-        if key in key_to_choice and key_to_choice[key] in choice_buttons:
-            choice = key_to_choice[key]
-            animate_button(choice_buttons[choice], choice, lambda: make_choice(choice))
+        btn = themed(tk.Button(choice_frame, bd=0), "frame")
+        btn.config(command=lambda c=choice: choose(c))
+        btn.bind("<ButtonRelease-1>", stamp_click)
+        btn.pack(side="left", padx=padx_val, expand=True)
+        choice_buttons[choice] = btn
+    update_choice_images()
+    layout_callbacks.append(update_choice_images)
+
+    back_button(main_frame)
+    game_widgets.update(mode=mode_label, score=score_label, streak=streak_label, power_up=power_up_label, recent=recent_label,
+                        player_img=player_img_label, computer_img=computer_img_label, result=result_label,
+                        choose=choose)
+    return screen
+
+def update_score_labels():
+    game_widgets["score"].config(text=f"Player: {match.scores['player']}  Computer: {match.scores['computer']}")
+    game_widgets["streak"].config(text=f"Streak: {match.win_streak}  Best: {match.best_streak}")
+    game_widgets["power_up"].config(text="⚡ Power-Up Active!" if match.power_up_active else "")
+    marks = ("=", "✓", "✗")
+    recent = " ".join(marks[result] for p, c, result, *_ in match.history.last(RECENT_ROUNDS))
+    game_widgets["recent"].config(text=f"Last rounds: {recent}" if recent else "")
+
+def refresh_game_screen():
+    game_widgets["mode"].config(text=f"Mode: {match.mode}")
+    game_widgets["player_img"].config(image="", text="")
+    game_widgets["computer_img"].config(image="", text="")
+    game_widgets["result"].config(text="")
+    update_score_labels()
 
-    root.bind("<KeyPress>", handle_key)
+def show_game_screen():
+    show_input_popup()
+    show_screen("game", build_game_screen, refresh_game_screen)
 
-    tk.Button(main_frame, text="🔙 Back to Menu", font=("Helvetica", 14 if is_fullscreen else 12), bg=themes[current_theme]["buttons"]["back"], fg=themes[current_theme]["fg"],
-              command=show_main_menu).pack(pady=20)
+def handle_key(event):
+    key = event.keysym.lower()
+    key_to_choice = {"r": "rock", "s": "scissors", "p": "paper"}
+    if key in key_to_choice:
+        game_widgets["choose"](key_to_choice[key], profiler.event_clock(event.time))
 
 def start_game(selected_mode):
-    global mode
-    mode = selected_mode
+    match.mode = selected_mode
+    if selected_mode == "Adaptive" and match.ai is None:
+        match.ai = Predictor()
+        match.ai.warm_start(profile.log)
     show_game_screen()
 
-def update_layout(event=None):
-    global is_fullscreen
+def update_layout():
+    global is_fullscreen, layout_job
+    layout_job = None
     new_is_fullscreen = root.winfo_width() >= 800
     if new_is_fullscreen != is_fullscreen:
         is_fullscreen = new_is_fullscreen
-        if mode:
-            show_game_screen()
-        else:
-            show_main_menu()
+        apply_layout()
+
+def on_configure(event):
+    # <Configure> fires for every widget and every pixel of a drag; only the
+    # window's own size matters, and only once it settles.
+    global layout_job
+    if event.widget is not root:
+        return
+    if layout_job is not None:
+        root.after_cancel(layout_job)
+    layout_job = root.after(LAYOUT_DEBOUNCE_MS, update_layout)
+
+def report_first_frame():
+    root.update_idletasks()
+    profiler.lap("startup.first_frame", startup_clock)
+    profiler.lap("startup.total", start_time)
+    print(f"First frame after {(time.perf_counter() - start_time) * 1000:.0f} ms")
 
-root.bind("<Configure>", update_layout)
+root.bind("<Configure>", on_configure)
+root.protocol("WM_DELETE_WINDOW", quit_game)
 
 # Start the game
+serve_env(profiler)
 show_main_menu()
+root.after_idle(report_first_frame)
+sync_bgm()
 root.mainloop()
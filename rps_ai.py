@@ -0,0 +1,91 @@
+# Adaptive opponent for the "Adaptive" mode.
+# An ensemble of frequency / Markov models predicts the player's next move from
+# past rounds only, and the computer plays the counter. Each model keeps a
+# fixed-size count table indexed by its current context, so predicting and
+# learning are O(1) per round no matter how many rounds have been seen.
+# Tables grow as n ** (order + 1) for an n-move variant, so higher orders are
+# left out for big variants rather than allocate more than MAX_COUNTS each.
+from array import array
+from rps_rules import CLASSIC
+
+OUTCOMES = 3
+DECAY = 0.9
+# Counters per model (4 bytes each)
+MAX_COUNTS = 1 << 20
+
+class _Model:
+    # A symbol is the player's move alone (base n) or move and outcome
+    # (base 3n); the context is the last `order` symbols packed into one int.
+    def __init__(self, order, with_outcome, moves):
+        self.order = order
+        self.moves = moves
+        self.with_outcome = with_outcome
+        self.base = moves * OUTCOMES if with_outcome else moves
+        self.contexts = self.base ** order
+        self.counts = array("I", bytes(4 * self.contexts * moves))
+        self.context = 0
+        self.score = 0.0
+
+    def predict(self, rounds):
+        if rounds < self.order:
+            return None
+        i = self.context * self.moves
+        row = self.counts[i:i + self.moves]
+        best = max(row)
+        if best == 0:
+            return None
+        return row.index(best)
+
+    def learn(self, p, outcome):
+        self.counts[self.context * self.moves + p] += 1
+        if self.order:
+            symbol = p * OUTCOMES + outcome if self.with_outcome else p
+            self.context = (self.context * self.base + symbol) % self.contexts
+
+class Predictor:
+    def __init__(self, orders=(1, 2, 3), outcome_orders=(1, 2), variant=CLASSIC):
+        # Order 0 is the plain frequency table.
+        self.variant = variant
+        n = variant.n
+        self.models = [_Model(0, False, n)]
+        self.models += [_Model(k, False, n) for k in orders if n ** (k + 1) <= MAX_COUNTS]
+        self.models += [_Model(k, True, n) for k in outcome_orders if (n * OUTCOMES) ** k * n <= MAX_COUNTS]
+        self.rounds = 0
+
+    def predict(self):
+        # Weighted vote of the models that have been right more than wrong lately.
+        votes = [0.0] * self.variant.n
+        for model in self.models:
+            guess = model.predict(self.rounds)
+            if guess is not None and model.score > 0:
+                votes[guess] += model.score
+        best = max(votes)
+        return votes.index(best) if best > 0 else None
+
+    def choose(self, rng):
+        # Always draws once, like the other modes, so seeded sessions stay in
+        # step with the log.
+        draw = rng.random()
+        guess = self.predict()
+        if guess is None:
+            return int(draw * self.variant.n)
+        counters = self.variant.counters[guess]
+        return counters[min(int(draw * len(counters)), len(counters) - 1)]
+
+    def observe(self, p, c):
+        outcome = self.variant.table[p][c]
+        for model in self.models:
+            guess = model.predict(self.rounds)
+            if guess is not None:
+                model.score = model.score * DECAY + (1.0 if guess == p else -1.0)
+            model.learn(p, outcome)
+        self.rounds += 1
+
+    def warm_start(self, log, limit=10000):
+        # Replay the Adaptive rounds among the most recent rounds of the game
+        # log; like Match.score_round, other modes' rounds are not learned from.
+        from rps_engine import modes
+        adaptive = modes.index("Adaptive")
+        for record in log.iter_records(max(len(log) - limit, 0)):
+            if record[4] == adaptive:
+                self.observe(record[1], record[2])
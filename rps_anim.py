@@ -0,0 +1,59 @@
+# Frame-scheduled animations for the Tk front end.
+# Every animation runs off one timer instead of its own root.after chain. An
+# animation is a list of (ms from start, callback) frames registered under a
+# key such as (widget, "shake"); starting another animation under the same key
+# replaces the old one, so repeated input never stacks timers on a widget.
+# Each tick applies only the latest due frame per key (frames that were
+# missed are skipped, not replayed), and ticks are at least 1/fps apart. The
+# timer only runs while something is animating.
+import math
+import time
+
+class Animator:
+    def __init__(self, root, fps=60):
+        self.root = root
+        self.frame_time = 1.0 / fps
+        self.animations = {}
+        self._job = None
+        self._job_time = None
+        self._last_tick = 0.0
+
+    def play(self, key, frames):
+        # frames: [(ms from now, callback)] in time order
+        self.animations[key] = (time.perf_counter(), frames, [0])
+        self._schedule()
+
+    def _next_due(self):
+        return min(start + frames[index[0]][0] / 1000 for start, frames, index in self.animations.values())
+
+    def _schedule(self):
+        if not self.animations:
+            return
+        now = time.perf_counter()
+        when = max(self._next_due(), self._last_tick + self.frame_time, now)
+        if self._job is not None:
+            if self._job_time <= when:
+                return
+            self.root.after_cancel(self._job)
+        self._job_time = when
+        self._job = self.root.after(math.ceil((when - now) * 1000), self._tick)
+
+    def _tick(self):
+        self._job = None
+        now = self._last_tick = time.perf_counter()
+        for key, animation in list(self.animations.items()):
+            if self.animations.get(key) is not animation:
+                continue
+            start, frames, index = animation
+            elapsed = (now - start) * 1000
+            due = index[0]
+            while due + 1 < len(frames) and frames[due + 1][0] <= elapsed:
+                due += 1
+            if frames[due][0] > elapsed:
+                continue
+            index[0] = due + 1
+            if index[0] == len(frames):
+                del self.animations[key]
+            # The callback may start another animation under the same key.
+            frames[due][1]()
+        self._schedule()
@@ -0,0 +1,190 @@
+# Build-once cache of processed assets.
+# Resized images are stored as PNGs that Tk can load directly (no PIL on the
+# hot path) and sounds as raw PCM in the mixer's output format (no decoding).
+# Entries are keyed by the source file's hash plus the target size/format, so
+# replacing a file in assets/ invalidates its cached copies automatically.
+# Hashes are remembered per (mtime, size) in index.json so big files such as
+# bgm.mp3 are not re-read on every start.
+import hashlib
+import json
+import os
+import threading
+import tkinter as tk
+from rps_metrics import profiler
+
+CACHE_VERSION = 1
+
+class AssetCache:
+    def __init__(self, assets_dir, cache_dir):
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._images = {}
+        self._index = self._load_index()
+        self._index_dirty = False
+        # Sounds are loaded from a background thread while images load on the UI thread.
+        self._index_lock = threading.Lock()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        except (FileNotFoundError, ValueError):
+            pass
+        return {"version": CACHE_VERSION, "sources": {}}
+
+    def save_index(self):
+        with self._index_lock:
+            if not self._index_dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.index_path + f".{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+            self._index_dirty = False
+
+    def source_hash(self, name):
+        path = os.path.join(self.assets_dir, name)
+        st = os.stat(path)
+        with self._index_lock:
+            entry = self._index["sources"].get(name)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry["sha1"]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        with self._index_lock:
+            self._index["sources"][name] = {"mtime": st.st_mtime_ns, "size": st.st_size, "sha1": digest.hexdigest()}
+            self._index_dirty = True
+        return digest.hexdigest()
+
+    def _cache_path(self, name, variant, ext):
+        stem = os.path.splitext(name)[0]
+        return os.path.join(self.cache_dir, f"{stem}-{variant}-{self.source_hash(name)[:16]}.{ext}")
+
+    # Images
+    def image_path(self, name, size=None):
+        if size is None:
+            return os.path.join(self.assets_dir, name)
+        cached = self._cache_path(name, f"{size[0]}x{size[1]}", "png")
+        if not os.path.exists(cached):
+            from PIL import Image
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with Image.open(os.path.join(self.assets_dir, name)) as img:
+                resized = img.convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+            tmp_path = cached + ".tmp"
+            resized.save(tmp_path, format="PNG")
+            os.replace(tmp_path, cached)
+        return cached
+
+    def image(self, name, size=None):
+        # PhotoImages are kept here so Tk does not drop them.
+        key = (name, size)
+        if key not in self._images:
+            self._images[key] = tk.PhotoImage(file=self.image_path(name, size))
+        return self._images[key]
+
+    # Sounds
+    def sound(self, name):
+        import pygame
+        frequency, fmt, channels = pygame.mixer.get_init()
+        cached = self._cache_path(name, f"{frequency}-{fmt}-{channels}", "pcm")
+        try:
+            with open(cached, "rb") as f:
+                return pygame.mixer.Sound(buffer=f.read())
+        except FileNotFoundError:
+            pass
+        sound = pygame.mixer.Sound(os.path.join(self.assets_dir, name))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = cached + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(tmp_path, cached)
+        return sound
+
+# Background audio
+# The mixer is initialized and sound effects are loaded on a worker thread so
+# the first screen does not wait for pygame. Until an effect is ready, playing
+# it does nothing. Background music is streamed with pygame.mixer.music rather
+# than decoded into memory; if it was requested before the mixer was ready it
+# starts as soon as loading finishes. music_playing says whether it really is
+# playing, which stays False if the mixer or the music file failed to load.
+class SoundBank:
+    def __init__(self, cache, effects, music=None, music_volume=0.5):
+        self.cache = cache
+        self.effects = effects
+        self.music = music
+        self.music_volume = music_volume
+        self.sounds = {}
+        self.music_wanted = False
+        self.music_playing = False
+        self._mixer = None
+        self._lock = threading.Lock()
+        self.ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._load, name="sound-loader", daemon=True).start()
+
+    def _load(self):
+        try:
+            with profiler.timer("startup.mixer_init"):
+                import pygame
+                pygame.mixer.init()
+            print("Pygame mixer initialized.")
+        except Exception as e:
+            print(f"Failed to initialize mixer: {e}")
+            self.ready.set()
+            return
+        for key, name in self.effects.items():
+            try:
+                with profiler.timer("load_sound"):
+                    self.sounds[key] = self.cache.sound(name)
+                print(f"Loaded sound: {name}")
+            except Exception as e:
+                print(f"Sound load error: {name} → {e}")
+        self.cache.save_index()
+        with self._lock:
+            if self.music:
+                try:
+                    with profiler.timer("startup.music_load"):
+                        pygame.mixer.music.load(os.path.join(self.cache.assets_dir, self.music))
+                    pygame.mixer.music.set_volume(self.music_volume)
+                    self._mixer = pygame.mixer
+                except Exception as e:
+                    print(f"Music load error: {self.music} → {e}")
+            if self.music_wanted:
+                self._start_music()
+        self.ready.set()
+
+    def play(self, key):
+        sound = self.sounds.get(key)
+        if sound:
+            sound.play()
+
+    def _start_music(self):
+        if not self._mixer:
+            return
+        try:
+            self._mixer.music.play(loops=-1)
+            self.music_playing = True
+        except Exception as e:
+            print(f"Music play error: {self.music} → {e}")
+
+    def play_music(self):
+        # Returns whether the music is playing now; it is not while the mixer
+        # is still loading (check again once `ready` is set).
+        with self._lock:
+            self.music_wanted = True
+            self._start_music()
+            return self.music_playing
+
+    def stop_music(self):
+        with self._lock:
+            self.music_wanted = False
+            self.music_playing = False
+            if self._mixer:
+                self._mixer.music.stop()
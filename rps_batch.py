@@ -0,0 +1,153 @@
+# Vectorized round simulator for Monte Carlo runs.
+# Moves and results are small ints so whole batches can be scored with numpy;
+# the output matches Match.play round for round given the same rng draws. The
+# lookup tables are numpy copies of the variant's tables in rps_rules.py, the
+# same ones Match uses one round at a time.
+import numpy as np
+from rps_engine import choices, results
+from rps_rules import CLASSIC, DRAW, HARD_HIT_RATE, LOSE, WIN
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+
+move_codes = {name: i for i, name in enumerate(choices)}
+result_codes = {name: i for i, name in enumerate(results)}
+
+def encode_moves(moves):
+    return np.fromiter((move_codes[m] for m in moves), dtype=np.int8, count=len(moves))
+
+def decode_moves(codes):
+    return [choices[c] for c in codes]
+
+def decode_results(codes):
+    return [results[c] for c in codes]
+
+def draw_uniforms(rng, n):
+    # numpy Generators fill the batch in one call; the random module (or any
+    # other object with a scalar random()) is drained one value at a time.
+    try:
+        return np.asarray(rng.random(n), dtype=np.float64)
+    except TypeError:
+        return np.fromiter((rng.random() for _ in range(n)), dtype=np.float64, count=n)
+
+# Lookup tables indexed by small-int moves, built once per variant.
+# outcome[p * n + c] is DRAW/WIN/LOSE from the player's side; hard[miss, p, i]
+# is the i-th counter to p (miss = 0) or the i-th move that p beats (miss = 1).
+_tables = {}
+
+def tables(variant):
+    if variant not in _tables:
+        hard = None
+        if variant.balanced:
+            hard = np.array([variant.counters, variant.victims], dtype=np.int8)
+        _tables[variant] = (np.array(variant.outcome, dtype=np.int8), hard)
+    return _tables[variant]
+
+def move_dtype(variant):
+    # p * n + c must not overflow
+    return np.int8 if variant.n * variant.n <= 127 else np.int16
+
+# Rounds are scored in chunks that stay cache resident, using 1-based int32
+# positions so "no such round yet" is 0 and scans are plain running maxima.
+CHUNK = 1 << 14
+_chunk_pos = np.arange(1, CHUNK + 1, dtype=np.int32)
+_chunk_pos2 = _chunk_pos * 2
+
+def computer_moves(player_moves, mode, draws, variant=CLASSIC):
+    # Same arithmetic as Variant.hard_reply, so the picks match draw for draw.
+    if mode == "Adaptive":
+        raise ValueError("Adaptive mode depends on every earlier round; use Match.play")
+    if mode == "Easy":
+        return (draws * variant.n).astype(np.int8)
+    hard = tables(variant)[1]
+    if hard is None:
+        raise ValueError(f"{variant.name}: Hard mode in batches needs a balanced variant")
+    miss = draws >= HARD_HIT_RATE
+    k = hard.shape[2]
+    if k == 1:
+        return hard[miss.view(np.int8), player_moves, 0]
+    i = np.where(miss, (draws - HARD_HIT_RATE) / (1 - HARD_HIT_RATE) * k, draws / HARD_HIT_RATE * k)
+    return hard[miss.view(np.int8), player_moves, np.minimum(i.astype(np.intp), k - 1)]
+
+def _score_chunk(p, c, state, out, lo, outcome, n):
+    win_streak, best_streak, power_up_active, player_score, computer_score = state
+    m = len(p)
+    hi = lo + m
+    pos = _chunk_pos[:m]
+    result = out["result"][lo:hi]
+    np.take(outcome, p * n + c, out=result)
+    win = result == WIN
+
+    # Streak: distance to the last non-win round; rounds before the first
+    # break in the chunk continue the streak carried in from before.
+    last_break = np.maximum.accumulate(pos * (result != WIN).view(np.int8))
+    streak = out["streak"][lo:hi]
+    np.subtract(pos, last_break, out=streak)
+    if win_streak:
+        streak[:np.searchsorted(last_break, 1)] += win_streak
+
+    # Power-up after each round: set by a win with streak >= 3, cleared by any
+    # other win or a loss, and left untouched by a draw (same as Match.get_result).
+    # The last decisive round is found with one scan over pos * 2 + flag.
+    power_set = win & (streak >= 3)
+    last = np.maximum.accumulate((_chunk_pos2[:m] + power_set) * (result != DRAW).view(np.int8))
+    power_after = out["power_up"][lo:hi]
+    np.bitwise_and(last, 1, out=power_after, casting="unsafe")
+    power_after[:np.searchsorted(last, 1)] = power_up_active
+
+    # A win scores double when the power-up was active after the previous round.
+    player_points = win.view(np.int8).copy()
+    player_points[1:] += (win[1:] & power_after[:-1]).view(np.int8)
+    player_points[0] += win[0] and power_up_active
+    player_scores = out["player_score"][lo:hi]
+    np.add(np.cumsum(player_points, dtype=np.int32), player_score, out=player_scores)
+    computer_scores = out["computer_score"][lo:hi]
+    np.add(np.cumsum(result == LOSE, dtype=np.int32), computer_score, out=computer_scores)
+
+    return (int(streak[-1]), max(best_streak, int(streak.max())), bool(power_after[-1]),
+            int(player_scores[-1]), int(computer_scores[-1]))
+
+def _new_output(n, variant=CLASSIC):
+    return {
+        "computer": np.empty(n, dtype=move_dtype(variant)),
+        "result": np.empty(n, dtype=np.int8),
+        "player_score": np.empty(n, dtype=np.int64),
+        "computer_score": np.empty(n, dtype=np.int64),
+        "streak": np.empty(n, dtype=np.int32),
+        "power_up": np.empty(n, dtype=bool),
+    }
+
+def score_rounds(player_moves, computer, win_streak=0, best_streak=0, power_up_active=False,
+                 player_score=0, computer_score=0, variant=CLASSIC):
+    player_moves = np.asarray(player_moves, dtype=move_dtype(variant))
+    n = len(player_moves)
+    out = _new_output(n, variant)
+    out["computer"][:] = computer
+    outcome = tables(variant)[0]
+    state = (win_streak, best_streak, power_up_active, player_score, computer_score)
+    for lo in range(0, n, CHUNK):
+        hi = min(lo + CHUNK, n)
+        state = _score_chunk(player_moves[lo:hi], out["computer"][lo:hi], state, out, lo, outcome, variant.n)
+    return out
+
+def play_batch(match, player_moves, draws=None):
+    variant = match.variant
+    player_moves = np.asarray(player_moves, dtype=move_dtype(variant))
+    n = len(player_moves)
+    out = _new_output(n, variant)
+    outcome = tables(variant)[0]
+    state = (match.win_streak, match.best_streak, match.power_up_active,
+             match.scores["player"], match.scores["computer"])
+    # Draws are taken chunk by chunk; a numpy Generator yields the same stream
+    # either way, and the working set stays in cache.
+    for lo in range(0, n, CHUNK):
+        hi = min(lo + CHUNK, n)
+        p = player_moves[lo:hi]
+        d = draws[lo:hi] if draws is not None else draw_uniforms(match.rng, hi - lo)
+        c = out["computer"][lo:hi]
+        c[:] = computer_moves(p, match.mode, d, variant)
+        state = _score_chunk(p, c, state, out, lo, outcome, variant.n)
+    if n:
+        (match.win_streak, match.best_streak, match.power_up_active,
+         match.scores["player"], match.scores["computer"]) = state
+        match.game_count += n
+    return out
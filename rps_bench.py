@@ -0,0 +1,308 @@
+# Benchmark suite for the game's hot paths.
+# Each benchmark reports the best time per operation over --repeat runs.
+# Results can be written as JSON and compared against a stored baseline;
+# anything slower than the baseline by more than --threshold is reported as
+# a regression and the exit status is 1.
+#
+#   python rps_bench.py                          # run and print
+#   python rps_bench.py --save-baseline          # store bench_baseline.json
+#   python rps_bench.py --compare                # fail on regressions
+#   python rps_bench.py --sizes 10k,1M,10M -k log
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "bench_baseline.json")
+DEFAULT_SIZES = "10k,1M"
+# Decoding every row into dicts (GameLog.rows) is only timed up to this size.
+MAX_ROWS_DECODED = 1_000_000
+
+benchmarks = []
+
+def benchmark(name):
+    # fn(ctx) returns (seconds, operations)
+    def register(fn):
+        benchmarks.append((name, fn))
+        return fn
+    return register
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+def timed(fn, ops):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, ops
+
+def make_log(path, rows):
+    # Writes a synthetic log directly with numpy; much faster than appending.
+    import numpy as np
+    from rps_log import GameLog, record_dtype
+    log = GameLog(path)
+    rng = np.random.default_rng(rows)
+    chunk = 1_000_000
+    with open(path, "ab") as f:
+        for start in range(0, rows, chunk):
+            n = min(chunk, rows - start)
+            records = np.zeros(n, dtype=record_dtype())
+            records["timestamp"] = 1.7e9 + np.arange(start, start + n)
+            records["player"] = rng.integers(0, 3, n)
+            records["computer"] = rng.integers(0, 3, n)
+            records["result"] = (records["player"].astype(np.int8) - records["computer"]) % 3
+            records["mode"] = rng.integers(0, 2, n)
+            records["streak"] = rng.integers(0, 12, n)
+            records.tofile(f)
+    return log
+
+# Engine
+@benchmark("engine.get_computer_choice.easy")
+def bench_choice_easy(ctx):
+    from rps_engine import get_computer_choice
+    rng = random.Random(1)
+    n = 200_000
+    return timed(lambda: [get_computer_choice("rock", "Easy", rng) for _ in range(n)], n)
+
+@benchmark("engine.get_computer_choice.hard")
+def bench_choice_hard(ctx):
+    from rps_engine import get_computer_choice
+    rng = random.Random(1)
+    n = 200_000
+    return timed(lambda: [get_computer_choice("rock", "Hard", rng) for _ in range(n)], n)
+
+@benchmark("engine.get_result")
+def bench_get_result(ctx):
+    from rps_engine import Match, choices
+    match = Match("Easy")
+    rng = random.Random(2)
+    pairs = [(rng.choice(choices), rng.choice(choices)) for _ in range(200_000)]
+    return timed(lambda: [match.get_result(p, c) for p, c in pairs], len(pairs))
+
+@benchmark("engine.score_round")
+def bench_score_round(ctx):
+    from rps_engine import Match
+    match = Match("Easy")
+    rng = random.Random(2)
+    pairs = [(rng.randrange(3), rng.randrange(3)) for _ in range(200_000)]
+    return timed(lambda: [match.score_round(p, c) for p, c in pairs], len(pairs))
+
+@benchmark("engine.play.adaptive")
+def bench_play_adaptive(ctx):
+    from rps_engine import Match, choices
+    match = Match("Adaptive", random.Random(3))
+    moves = [choices[i % 3] for i in range(20_000)]
+    return timed(lambda: [match.play(m) for m in moves], len(moves))
+
+@benchmark("batch.play_batch.hard")
+def bench_batch(ctx):
+    import numpy as np
+    from rps_batch import play_batch
+    from rps_engine import Match
+    moves = np.random.default_rng(4).integers(0, 3, 2_000_000).astype(np.int8)
+    match = Match("Hard", np.random.default_rng(5))
+    return timed(lambda: play_batch(match, moves), len(moves))
+
+# Logging
+@benchmark("log.append")
+def bench_log_append(ctx):
+    from rps_log import GameLog
+    log = GameLog(os.path.join(ctx["tmp"], "append.bin"))
+    n = 20_000
+    try:
+        return timed(lambda: [log.append("rock", "paper", "You Lose", "Easy", 0, i, 0) for i in range(n)], n)
+    finally:
+        log.close()
+
+@benchmark("log.writer")
+def bench_log_writer(ctx):
+    from rps_log import GameLog, LogWriter
+    writer = LogWriter(GameLog(os.path.join(ctx["tmp"], "writer.bin")), batch_size=256)
+    n = 100_000
+    def run():
+        for i in range(n):
+            writer.append("rock", "paper", "You Lose", "Easy", 0, i, 0)
+        writer.flush()
+    try:
+        return timed(run, n)
+    finally:
+        writer.close()
+
+def log_of_size(ctx, rows):
+    path = os.path.join(ctx["tmp"], f"log-{rows}.bin")
+    if not os.path.exists(path):
+        make_log(path, rows)
+    from rps_log import GameLog
+    return GameLog(path)
+
+def register_size_benchmarks(sizes):
+    for rows in sizes:
+        label = f"{rows:,}".replace(",", "_")
+
+        if rows <= MAX_ROWS_DECODED:
+            @benchmark(f"log.rows.{label}")
+            def bench_rows(ctx, rows=rows):
+                log = log_of_size(ctx, rows)
+                return timed(log.rows, rows)
+
+        @benchmark(f"log.iter_records.{label}")
+        def bench_iter(ctx, rows=rows):
+            log = log_of_size(ctx, rows)
+            return timed(lambda: sum(1 for _ in log.iter_records()), rows)
+
+        @benchmark(f"log.records_numpy.{label}")
+        def bench_numpy(ctx, rows=rows):
+            log = log_of_size(ctx, rows)
+            return timed(lambda: int(log.records()["streak"].sum()), rows)
+
+        @benchmark(f"stats.rebuild.{label}")
+        def bench_stats_rebuild(ctx, rows=rows):
+            from rps_stats import GameStats
+            log = log_of_size(ctx, rows)
+            return timed(lambda: GameStats().rebuild(log), rows)
+
+        @benchmark(f"leaderboard.rebuild.{label}")
+        def bench_board_rebuild(ctx, rows=rows):
+            from rps_leaderboard import Leaderboard
+            log = log_of_size(ctx, rows)
+            return timed(lambda: Leaderboard(k=5).rebuild(log), rows)
+
+# Screens (what show_stats / show_leaderboard compute when opened)
+@benchmark("stats.show")
+def bench_show_stats(ctx):
+    from rps_stats import GameStats
+    stats = GameStats()
+    rng = random.Random(6)
+    for _ in range(10_000):
+        stats.add(rng.randrange(3), rng.randrange(3), rng.randrange(3), rng.randrange(2))
+    path = os.path.join(ctx["tmp"], "stats.json")
+    stats.path = path
+    stats.save()
+    n = 2_000
+    def run():
+        for _ in range(n):
+            s = GameStats(path)
+            (s.total_games, s.wins, s.losses, s.draws, s.favorite_choice, s.win_rate)
+    return timed(run, n)
+
+@benchmark("leaderboard.show")
+def bench_show_leaderboard(ctx):
+    from rps_leaderboard import Leaderboard
+    from rps_log import decode_record
+    board = Leaderboard(k=5)
+    rng = random.Random(7)
+    for i in range(10_000):
+        board.add_record((1.7e9 + i, 0, 1, 2, rng.randrange(2), 0, 0, rng.randrange(20)))
+    n = 20_000
+    return timed(lambda: [[decode_record(r) for r in board.top()] for _ in range(n)], n)
+
+# Startup
+@benchmark("startup.import_engine")
+def bench_import(ctx):
+    n = 5
+    code = "import rps_engine, rps_log, rps_stats, rps_leaderboard"
+    return timed(lambda: [subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True) for _ in range(n)], n)
+
+@benchmark("assets.image_cold")
+def bench_assets_cold(ctx):
+    from rps_assets import AssetCache
+    n = 10
+    def run():
+        for i in range(n):
+            cache = AssetCache(os.path.join(BASE_DIR, "assets"), os.path.join(ctx["tmp"], f"cache-{i}"))
+            cache.image_path("paper.png", (80, 80))
+    return timed(run, n)
+
+@benchmark("assets.image_warm")
+def bench_assets_warm(ctx):
+    from rps_assets import AssetCache
+    cache_dir = os.path.join(ctx["tmp"], "cache-warm")
+    cache = AssetCache(os.path.join(BASE_DIR, "assets"), cache_dir)
+    cache.image_path("paper.png", (80, 80))
+    cache.save_index()
+    n = 200
+    return timed(lambda: [AssetCache(os.path.join(BASE_DIR, "assets"), cache_dir).image_path("paper.png", (80, 80))
+                          for _ in range(n)], n)
+
+# Runner
+def run(selected, repeat):
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="rps-bench-")
+    ctx = {"tmp": tmp}
+    try:
+        for name, fn in selected:
+            best = None
+            try:
+                for _ in range(repeat):
+                    seconds, ops = fn(ctx)
+                    per_op = seconds / ops
+                    best = per_op if best is None else min(best, per_op)
+            except ImportError as e:
+                print(f"{name:<44} skipped ({e})")
+                continue
+            results[name] = {"seconds_per_op": best, "ops_per_second": 1 / best}
+            print(f"{name:<44}{format_time(best):>14}{1 / best:>18,.0f} ops/s")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = result["seconds_per_op"] / before["seconds_per_op"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{name:<44}{change:>+10.1%}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock Paper Scissors benchmarks")
+    parser.add_argument("-k", dest="filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="log sizes, e.g. 10k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    register_size_benchmarks([parse_size(s) for s in args.sizes.split(",") if s])
+    selected = [(name, fn) for name, fn in benchmarks if args.filter in name]
+    results = run(selected, args.repeat)
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "platform": platform.platform(), "machine": platform.machine()},
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    if args.compare:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
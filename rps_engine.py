@@ -0,0 +1,146 @@
+# Headless game engine for Rock Paper Scissors.
+# No GUI or audio imports here so the rules can be used by the Tk front end,
+# servers, tests and simulations alike.
+import os
+import random
+from rps_ai import Predictor
+from rps_history import MAX_MOVES, History, pack_round, unpack_round
+from rps_rules import CLASSIC, LOSE, RESULTS, WIN
+
+# Game constants (the classic variant; see rps_rules.py for others)
+choices = CLASSIC.moves
+modes = ["Easy", "Hard", "Adaptive"]
+results = RESULTS
+
+# Seeded sessions
+# Draw i of a session is a hash (splitmix64) of (seed, i) rather than the next
+# value of a stateful generator, so a session can be resumed or replayed from
+# any round without drawing the earlier ones. Every mode takes exactly one
+# draw per round, so draw i belongs to log record i.
+MASK64 = (1 << 64) - 1
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), "little") or 1
+
+class SessionRng:
+    def __init__(self, seed, position=0):
+        self.seed = seed
+        self.position = position
+
+    def seek(self, position):
+        self.position = position
+
+    def random(self):
+        self.position += 1
+        z = (self.seed + self.position * 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return ((z ^ (z >> 31)) >> 11) * (1.0 / (1 << 53))
+
+# Game logic
+# Moves are ints (indexes into variant.moves) on the hot path; the string
+# functions are thin wrappers for the GUI, the log and the network protocol.
+def computer_move(p, mode, rng=random, ai=None, variant=CLASSIC):
+    # Only rng.random() is used so a numpy Generator can stand in for the
+    # random module and rps_batch can replay the exact same draws.
+    if mode == "Easy":
+        return int(rng.random() * variant.n)
+    elif mode == "Adaptive":
+        # Predicts from earlier rounds only; p is not looked at.
+        return ai.choose(rng)
+    else:
+        return variant.hard_reply(p, rng.random())
+
+def get_computer_choice(player_choice, mode, rng=random, ai=None, variant=CLASSIC):
+    return variant.moves[computer_move(variant.codes.get(player_choice), mode, rng, ai, variant)]
+
+class Match:
+    # All of a match's state; slots keep long-running sessions compact.
+    __slots__ = ("mode", "rng", "variant", "ai", "history", "scores", "win_streak", "best_streak",
+                 "power_up_active", "game_count")
+
+    def __init__(self, mode=None, rng=None, variant=CLASSIC, history=0):
+        self.mode = mode
+        self.rng = rng if rng is not None else random
+        self.variant = variant
+        self.ai = None
+        # Keep the last `history` rounds (for display and undo) if asked to.
+        if history and variant.n > MAX_MOVES:
+            raise ValueError(f"{variant.name} has {variant.n} moves; round history holds at most {MAX_MOVES}")
+        self.history = History(history) if history else None
+        self.reset()
+
+    def reset(self):
+        self.scores = {"player": 0, "computer": 0}
+        self.win_streak = 0
+        self.best_streak = 0
+        self.power_up_active = False
+        self.game_count = 0
+        if self.history is not None:
+            self.history.clear()
+
+    def computer_move(self, p):
+        if self.mode == "Adaptive" and self.ai is None:
+            self.ai = Predictor(variant=self.variant)
+        return computer_move(p, self.mode, self.rng, self.ai, self.variant)
+
+    def score_round(self, p, c):
+        # Int moves in, result code out.
+        history = self.history
+        if history is not None:
+            before = (self.scores["player"], self.scores["computer"], self.win_streak, self.best_streak,
+                      self.power_up_active)
+        self.game_count += 1
+        # The AI learns only from Adaptive rounds; switching to Easy or Hard
+        # and back leaves it where it was.
+        if self.mode == "Adaptive" and self.ai is not None:
+            self.ai.observe(p, c)
+        result = self.variant.table[p][c]
+        if result == WIN:
+            self.scores["player"] += (2 if self.power_up_active else 1)
+            self.win_streak += 1
+            if self.win_streak > self.best_streak:
+                self.best_streak = self.win_streak
+            self.power_up_active = self.win_streak >= 3
+        elif result == LOSE:
+            self.scores["computer"] += 1
+            self.win_streak = 0
+            self.power_up_active = False
+        else:
+            self.win_streak = 0
+        if history is not None:
+            history.append(pack_round(p, c, result, self.scores["player"] - before[0],
+                                      self.scores["computer"] - before[1], before[4],
+                                      self.best_streak > before[3], before[2]))
+        return result
+
+    def undo(self):
+        # Takes back the newest round in the history and returns (p, c, result).
+        # The adaptive AI keeps what it saw, and the game log is not touched.
+        if self.history is None:
+            raise ValueError("undo needs a Match created with history=N")
+        p, c, result, player_points, computer_points, power_before, new_best, streak_before = \
+            unpack_round(self.history.pop())
+        self.scores["player"] -= player_points
+        self.scores["computer"] -= computer_points
+        self.win_streak = streak_before
+        self.power_up_active = power_before
+        if new_best:
+            self.best_streak -= 1
+        self.game_count -= 1
+        return p, c, result
+
+    def play_round(self, p):
+        c = self.computer_move(p)
+        return c, self.score_round(p, c)
+
+    def get_computer_choice(self, player_choice):
+        return self.variant.moves[self.computer_move(self.variant.codes.get(player_choice))]
+
+    def get_result(self, p, c):
+        codes = self.variant.codes
+        return results[self.score_round(codes[p], codes[c])]
+
+    def play(self, player_choice):
+        c, result = self.play_round(self.variant.codes[player_choice])
+        return self.variant.moves[c], results[result]
@@ -0,0 +1,107 @@
+# Bounded in-memory history of a match.
+# Each round is packed into one 64-bit slot of a preallocated array, so a
+# history of N rounds costs 8 * N bytes however long the session runs; the
+# oldest rounds are overwritten once it is full. A slot holds enough to show
+# recent rounds and undo the round exactly:
+#
+#   bits 0-7   player move          bits 8-15  computer move
+#   bits 16-17 result               bits 18-19 player points scored
+#   bit 20     computer scored      bit 21     power-up was active before
+#   bit 22     set a new best       bits 32-63 streak before
+#
+# Variants of up to MAX_MOVES moves fit. Streaks are kept to 32 bits like the
+# game log's, so undo is exact up to the same 4 billion wins in a row.
+#
+#   python rps_history.py [--rounds 1000000] [--capacity 4096]
+import sys
+from array import array
+
+MAX_MOVES = 256
+STREAK_MAX = 0xFFFFFFFF
+
+def pack_round(p, c, result, player_points, computer_points, power_before, new_best, streak_before):
+    return (p | c << 8 | result << 16 | player_points << 18 | computer_points << 20 | power_before << 21
+            | new_best << 22 | min(streak_before, STREAK_MAX) << 32)
+
+def unpack_round(slot):
+    # (p, c, result, player points, computer points, power before, new best, streak before)
+    return (slot & 0xFF, slot >> 8 & 0xFF, slot >> 16 & 3, slot >> 18 & 3, slot >> 20 & 1, bool(slot >> 21 & 1),
+            bool(slot >> 22 & 1), slot >> 32)
+
+class History:
+    __slots__ = ("capacity", "slots", "start", "count", "total")
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.slots = array("Q", bytes(8 * capacity))
+        self.clear()
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+        # Rounds ever recorded, including ones overwritten since.
+        self.total = 0
+
+    def append(self, slot):
+        if self.count < self.capacity:
+            self.slots[(self.start + self.count) % self.capacity] = slot
+            self.count += 1
+        else:
+            self.slots[self.start] = slot
+            self.start = (self.start + 1) % self.capacity
+        self.total += 1
+
+    def pop(self):
+        if not self.count:
+            raise IndexError("pop from empty history")
+        self.count -= 1
+        self.total -= 1
+        return self.slots[(self.start + self.count) % self.capacity]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        # 0 is the oldest round kept, -1 the newest.
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("history index out of range")
+        return unpack_round(self.slots[(self.start + i) % self.capacity])
+
+    def last(self, n):
+        # The newest n rounds, oldest first.
+        n = min(n, self.count)
+        return [self[i] for i in range(self.count - n, self.count)]
+
+    def memory_report(self):
+        buffer_bytes = self.slots.itemsize * len(self.slots)
+        return {
+            "capacity": self.capacity,
+            "rounds_kept": self.count,
+            "rounds_seen": self.total,
+            "bytes_per_round": self.slots.itemsize,
+            "buffer_bytes": buffer_bytes,
+            # Including the array and History object headers.
+            "total_bytes": sys.getsizeof(self.slots) + sys.getsizeof(self),
+        }
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    from rps_engine import Match
+    parser = argparse.ArgumentParser(description="Memory used by a match's round history")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--capacity", type=int, default=4096)
+    args = parser.parse_args()
+    match = Match("Hard", random.Random(1), history=args.capacity)
+    for i in range(args.rounds):
+        match.play_round(i % 3)
+    report = match.history.memory_report()
+    for key, value in report.items():
+        print(f"{key:<16}{value:>12,}")
+    # For comparison: the same rounds kept as a list of small tuples.
+    sample = [match.history[i] for i in range(len(match.history))]
+    per_tuple = (sys.getsizeof(sample) + sum(sys.getsizeof(t) for t in sample)) / max(len(sample), 1)
+    print(f"{'list of tuples':<16}{per_tuple:>12,.0f} bytes/round")
+    print(f"{'Match object':<16}{sys.getsizeof(match):>12,} bytes (no __dict__: {not hasattr(match, '__dict__')})")
@@ -0,0 +1,107 @@
+# Top-K streak leaderboards kept next to the game log.
+# Each board is a bounded min-heap of (streak, -timestamp, record), so adding a
+# round is O(log K) and reading a board is O(K log K) no matter how long the log
+# is. Ties on streak go to the earlier round. Boards exist for all rounds and
+# for each mode. Like GameStats, "rounds" tracks how much of the log is covered,
+# and rounds compacted out of the log's archive are kept as a board of their own.
+import heapq
+import json
+import os
+from rps_engine import modes
+from rps_log import NO_MODE
+
+ALL_MODES = "All"
+LEADERBOARD_VERSION = 1
+COMPACTED_LEADERBOARD_FILE = "compacted_leaderboard.json"
+
+class Leaderboard:
+    def __init__(self, path=None, k=5):
+        self.path = path
+        self.k = k
+        self.clear()
+        if path:
+            self.load()
+
+    def clear(self):
+        self.rounds = 0
+        self.boards = {name: [] for name in [ALL_MODES] + modes}
+
+    def _push(self, board, entry):
+        if len(board) < self.k:
+            heapq.heappush(board, entry)
+        elif entry > board[0]:
+            heapq.heapreplace(board, entry)
+
+    def add_record(self, record):
+        record = tuple(record)
+        entry = (record[7], -record[0], record)
+        self.rounds += 1
+        self._push(self.boards[ALL_MODES], entry)
+        if record[4] != NO_MODE:
+            self._push(self.boards[modes[record[4]]], entry)
+
+    def top(self, mode=ALL_MODES):
+        return [entry[2] for entry in sorted(self.boards[mode], reverse=True)]
+
+    # Persistence
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data["k"] < self.k:
+                # Boards too small; caller's sync() will rebuild from the log.
+                self.clear()
+                self.rounds = -1
+                return
+            self.rounds = data["rounds"]
+            for name in self.boards:
+                board = heapq.nlargest(self.k, [(r[7], -r[0], tuple(r)) for r in data["boards"].get(name, [])])
+                heapq.heapify(board)
+                self.boards[name] = board
+        except FileNotFoundError:
+            self.clear()
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error loading leaderboard, starting empty: {e}")
+            self.clear()
+
+    def save(self):
+        data = {
+            "version": LEADERBOARD_VERSION,
+            "k": self.k,
+            "rounds": self.rounds,
+            "boards": {name: [entry[2] for entry in board] for name, board in self.boards.items()},
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    # Recovery
+    def sync(self, log):
+        n = len(log)
+        if self.rounds < 0 or self.rounds > n or self.rounds < log.first:
+            self.rebuild(log)
+            return
+        for record in log.iter_records(self.rounds):
+            self.add_record(record)
+
+    def rebuild(self, log):
+        self.clear()
+        if log.first:
+            # Rounds before `first` only exist in the compacted boards (see GameStats.rebuild).
+            compacted = Leaderboard(os.path.join(log.archive_dir, COMPACTED_LEADERBOARD_FILE), self.k)
+            if not log.first <= compacted.rounds <= len(log):
+                raise ValueError(f"compacted leaderboard covers {compacted.rounds} rounds (boards of at least "
+                                 f"{self.k} needed) but the log's raw rounds start at {log.first}; restore "
+                                 f"{COMPACTED_LEADERBOARD_FILE} or reset the profile")
+            self.boards = compacted.boards
+            self.rounds = compacted.rounds
+        for record in log.iter_records(self.rounds):
+            self.add_record(record)
+
+    def check(self, log):
+        # Names of the boards (and "rounds") that differ from a rebuild.
+        expected = Leaderboard(k=self.k)
+        expected.rebuild(log)
+        mismatched = ["rounds"] if self.rounds != expected.rounds else []
+        return mismatched + [name for name in self.boards if self.top(name) != expected.top(name)]
@@ -0,0 +1,107 @@
+# Headless bulk play and load generator.
+# Plays rounds against Easy, Hard or Adaptive mode through the same path as the
+# GUI (Match.get_computer_choice -> Match.get_result -> LogWriter.append, with
+# the profile's stats and leaderboard committed as batches land) but without
+# Tk or pygame, then reports rounds/s and the log bytes written. Use it to
+# build large test logs or to measure end-to-end throughput.
+#
+# The player is "random" or a comma separated script of moves that repeats.
+# Rounds go to a separate "Load Test" profile unless --player says otherwise,
+# and are timestamped with the real clock unless --interval spaces them out
+# (ending now), which makes hourly/daily reports in rps_query.py meaningful.
+# Either way no round is dated before the log's last one, since time lookups
+# (GameLog.find_time) rely on the log being in time order.
+#
+#   python rps_loadgen.py --rounds 1000000 --mode Hard [--script rock,rock,paper]
+#   python rps_loadgen.py --rounds 5000000 --interval 2 --session-length 50 --csv game_log.csv
+import argparse
+import itertools
+import os
+import random
+import time
+from rps_engine import Match, choices, modes
+from rps_log import RECORD, LogWriter, export_csv
+from rps_profiles import ProfileStore
+
+LOADGEN_PROFILE = "Load Test"
+# Same batching as the GUI's writer.
+LOG_BATCH_SIZE = 64
+LOG_MAX_DELAY = 1.0
+
+def make_player(script, seed=None):
+    # Returns a function giving the player's next move name.
+    if script == "random":
+        rng = random.Random(seed)
+        return lambda: rng.choice(choices)
+    moves = [move.strip().lower() for move in script.split(",") if move.strip()]
+    unknown = [move for move in moves if move not in choices]
+    if unknown or not moves:
+        raise ValueError(f"unknown moves in script: {', '.join(unknown) or script!r}")
+    return itertools.cycle(moves).__next__
+
+def play(profile, rounds, mode, player, session_length=0, interval=0.0, batch_size=LOG_BATCH_SIZE):
+    # Plays `rounds` rounds into the profile; returns (seconds, bytes written).
+    match = Match(mode, profile.start_session())
+    writer = LogWriter(profile.log, batch_size, LOG_MAX_DELAY, on_commit=profile.commit,
+                       on_rotate=profile.rotated)
+    rounds_before = len(profile.log)
+    last = profile.log.record(rounds_before - 1)[0] if rounds_before > profile.log.first else None
+    now = time.time()
+    first_timestamp = now - rounds * interval
+    if last is not None:
+        first_timestamp = max(first_timestamp, last + interval)
+    # The real clock is used as is unless the log already runs ahead of it.
+    clock = last if last is not None and last > now else None
+    start = time.perf_counter()
+    try:
+        for i in range(rounds):
+            if session_length and i and i % session_length == 0:
+                # A new game; the seeded rng carries on so replays still line up.
+                match.reset()
+                writer.start_session()
+            player_choice = player()
+            computer_choice = match.get_computer_choice(player_choice)
+            result = match.get_result(player_choice, computer_choice)
+            writer.append(player_choice, computer_choice, result, match.mode, match.scores["player"],
+                          match.scores["computer"], match.win_streak,
+                          first_timestamp + i * interval if interval else clock)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    # Raw bytes appended; rotation may since have compressed some of them.
+    return elapsed, (len(profile.log) - rounds_before) * RECORD.size
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play rounds headlessly through the real game log path")
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--mode", choices=modes, default="Hard")
+    parser.add_argument("--script", default="random", help="'random' or a comma separated list of moves to repeat")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random player")
+    parser.add_argument("--player", default=LOADGEN_PROFILE, help="profile to write to")
+    parser.add_argument("--session-length", type=int, default=0, help="rounds per game (0 for one game)")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between round timestamps")
+    parser.add_argument("--batch-size", type=int, default=LOG_BATCH_SIZE)
+    parser.add_argument("--reset", action="store_true", help="clear the profile first")
+    parser.add_argument("--csv", help="also export the profile's log to this CSV file")
+    args = parser.parse_args()
+    try:
+        player = make_player(args.script, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    store = ProfileStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+    profile = store.open(args.player)
+    if args.reset:
+        profile.reset()
+    elapsed, written = play(profile, args.rounds, args.mode, player, args.session_length, args.interval,
+                            args.batch_size)
+    print(f"{args.rounds:,} {args.mode} rounds for '{profile.name}' in {elapsed:.2f}s "
+          f"({args.rounds / max(elapsed, 1e-9):,.0f} rounds/s)")
+    print(f"Log bytes written: {written:,} ({written / max(args.rounds, 1):.1f} per round), "
+          f"log now {len(profile.log):,} rounds, {profile.log.disk_usage():,} bytes on disk")
+    if args.csv:
+        start = time.perf_counter()
+        try:
+            export_csv(profile.log, args.csv)
+            print(f"Exported to {args.csv} ({os.path.getsize(args.csv):,} bytes) in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            print(f"Error exporting log: {e}")
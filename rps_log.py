@@ -0,0 +1,581 @@
+# Append-only binary game log.
+# Every round is one fixed-width record after a 64 byte header, so record i
+# lives at HEADER_SIZE + i * RECORD.size and the whole file can be viewed as a
+# numpy structured array through mmap without parsing or copying.
+#
+# The live file is rotated (by size, or by the age of its first round) into
+# gzip-compressed segments in <name>_archive/, named after the range of rounds
+# they hold. Record numbers stay global: the live header stores how many rounds
+# were archived before it, and len(), iter_records(), record() and find_time()
+# span the archived segments and the live file alike. Segments dropped by
+# compaction (see rps_profiles.py) only survive in summaries, so raw reads
+# start at `first`.
+#
+# <name>.sessions lists the record number each game session started at (one
+# little-endian u64 per session), so tools can tell sessions apart without
+# guessing from the scores. Logs only have it from their first marked session.
+import csv
+import gzip
+import mmap
+import os
+import queue
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from rps_engine import choices, modes, new_seed, results
+
+LOG_MAGIC = b"RPSLOG\x00\x00"
+LOG_VERSION = 1
+# magic, version, record size, session seed, first seeded record, first record in the file
+HEADER = struct.Struct("<8sIIQQQ24x")
+HEADER_SIZE = HEADER.size
+# Archived segments also keep their first and last round's timestamps.
+SEGMENT_HEADER = struct.Struct("<8sIIQQQdd8x")
+# timestamp, player, computer, result, mode, player score, computer score, streak
+RECORD = struct.Struct("<dBBBBIII")
+# Records per read when streaming (1.5 MB)
+READ_CHUNK = 1 << 16
+ARCHIVE_SUFFIX = ".bin.gz"
+# Fast gzip: records compress well at any level, and rotation runs while the
+# game is being played.
+ARCHIVE_COMPRESSLEVEL = 1
+SESSIONS_SUFFIX = ".sessions"
+SESSION_MARK = struct.Struct("<Q")
+
+CSV_HEADER = ["Timestamp", "Player", "Computer", "Result", "Mode", "Player Score", "Computer Score", "Streak"]
+CSV_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+move_codes = {name: i for i, name in enumerate(choices)}
+result_codes = {name: i for i, name in enumerate(results)}
+mode_codes = {name: i for i, name in enumerate(modes)}
+NO_MODE = 255
+
+def record_dtype():
+    import numpy as np
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("player", "u1"),
+        ("computer", "u1"),
+        ("result", "u1"),
+        ("mode", "u1"),
+        ("player_score", "<u4"),
+        ("computer_score", "<u4"),
+        ("streak", "<u4"),
+    ])
+
+def make_record(p, c, result, mode, player_score, computer_score, streak, timestamp=None):
+    return (time.time() if timestamp is None else timestamp,
+            move_codes[p], move_codes[c], result_codes[result], mode_codes.get(mode, NO_MODE),
+            player_score, computer_score, streak)
+
+def encode_round(p, c, result, mode, player_score, computer_score, streak, timestamp=None):
+    return RECORD.pack(*make_record(p, c, result, mode, player_score, computer_score, streak, timestamp))
+
+def decode_record(record):
+    timestamp, p, c, result, mode, player_score, computer_score, streak = record
+    return {
+        "Timestamp": datetime.fromtimestamp(timestamp).strftime(CSV_TIME_FORMAT),
+        "Player": choices[p],
+        "Computer": choices[c],
+        "Result": results[result],
+        "Mode": modes[mode] if mode != NO_MODE else "",
+        "Player Score": player_score,
+        "Computer Score": computer_score,
+        "Streak": streak,
+    }
+
+def _read_records(f, count):
+    # Up to `count` records from f's position, read in READ_CHUNK pieces.
+    while count > 0:
+        n = min(READ_CHUNK, count)
+        data = f.read(n * RECORD.size)
+        n = len(data) // RECORD.size
+        if n == 0:
+            return
+        yield from RECORD.iter_unpack(data[:n * RECORD.size])
+        count -= n
+
+def _read_chunks(f, count):
+    # Like _read_records, as numpy arrays of up to READ_CHUNK records.
+    import numpy as np
+    dtype = record_dtype()
+    while count > 0:
+        n = min(READ_CHUNK, count)
+        data = f.read(n * RECORD.size)
+        n = len(data) // RECORD.size
+        if n == 0:
+            return
+        yield np.frombuffer(data, dtype=dtype, count=n)
+        count -= n
+
+def _trim(path, header_size, record_size):
+    # Drops a partial record from the end of the file, if there is one.
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+    whole = header_size + max(size - header_size, 0) // record_size * record_size
+    if size > whole:
+        os.truncate(path, whole)
+        print(f"Dropped {size - whole} bytes of a partial record from the end of {path}")
+
+class GameLog:
+    def __init__(self, path, rotate_bytes=0, rotate_age=0, create=True):
+        # Readers pass create=False so a missing log is an error rather than
+        # a new empty one.
+        self.path = path
+        # Rotate once the live file reaches rotate_bytes or its first round is
+        # rotate_age seconds old (0 turns either off).
+        self.rotate_bytes = rotate_bytes
+        self.rotate_age = rotate_age
+        stem = os.path.splitext(path)[0]
+        self.archive_dir = stem + "_archive"
+        self._segment_prefix = os.path.basename(stem) + "."
+        self.sessions_path = stem + SESSIONS_SUFFIX
+        self._segments = None
+        self._segment_times = {}
+        self._first_time = None
+        self._file = None
+        self.seed = 0
+        self.seed_start = 0
+        self.base = 0
+        self._ensure_header(create)
+
+    def _ensure_header(self, create=True):
+        # The session seed lives in the header; logs written before seeds
+        # existed read as seed 0 until ensure_seed() gives them one.
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"{self.path} is not a version {LOG_VERSION} game log (header is {len(header)} bytes)")
+            magic, version, record_size, self.seed, self.seed_start, self.base = HEADER.unpack(header)
+            if magic != LOG_MAGIC or record_size != RECORD.size:
+                raise ValueError(f"{self.path} is not a version {LOG_VERSION} game log")
+        except FileNotFoundError:
+            if not create:
+                raise
+            segments = self.segments()
+            self.base = segments[-1][1] if segments else 0
+            self.seed, self.seed_start = new_seed(), self.base
+            self._write_header("wb")
+        segments = self.segments()
+        if segments and segments[-1][1] > self.base:
+            # We stopped mid-rotation: the live rounds are archived already.
+            self._replace_live(segments[-1][1])
+
+    def _write_header(self, file_mode):
+        with open(self.path, file_mode) as f:
+            f.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, RECORD.size, self.seed, self.seed_start, self.base))
+
+    def ensure_seed(self):
+        # Seeds an old log from its next record on; earlier rounds stay unseeded.
+        if not self.seed:
+            self.seed, self.seed_start = new_seed(), len(self)
+            self._write_header("r+b")
+        return self.seed
+
+    def _open(self):
+        if self._file is None:
+            # A crash mid-write can leave part of a record at the end; appending
+            # after it would misalign every later record, so it is cut off first.
+            _trim(self.path, HEADER_SIZE, RECORD.size)
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, p, c, result, mode, player_score, computer_score, streak, timestamp=None):
+        record = make_record(p, c, result, mode, player_score, computer_score, streak, timestamp)
+        f = self._open()
+        f.write(RECORD.pack(*record))
+        f.flush()
+        return record
+
+    def append_many(self, records):
+        f = self._open()
+        f.write(b"".join(records))
+        f.flush()
+
+    def write_records(self, records, sync=False):
+        f = self._open()
+        f.write(b"".join(RECORD.pack(*record) for record in records))
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+    def reset(self, seed=None):
+        # A reset starts a new session with a new seed and drops the archive.
+        self.close()
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+        try:
+            os.remove(self.sessions_path)
+        except FileNotFoundError:
+            pass
+        self._segments = None
+        self._first_time = None
+        self.seed, self.seed_start, self.base = seed or new_seed(), 0, 0
+        self._write_header("wb")
+
+    # Sessions
+    def mark_session(self):
+        # The next record written starts a new session; call with all rounds written.
+        n = len(self)
+        starts = self.session_starts()
+        if not starts or starts[-1] != n:
+            _trim(self.sessions_path, 0, SESSION_MARK.size)
+            with open(self.sessions_path, "ab") as f:
+                f.write(SESSION_MARK.pack(n))
+
+    def session_starts(self):
+        try:
+            with open(self.sessions_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        return [start for (start,) in SESSION_MARK.iter_unpack(data[:len(data) // SESSION_MARK.size * SESSION_MARK.size])]
+
+    def _live_len(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        return max(size - HEADER_SIZE, 0) // RECORD.size
+
+    def __len__(self):
+        return self.base + self._live_len()
+
+    # Archive
+    def segments(self):
+        # Archived segments as (first record, stop, path), oldest first.
+        if self._segments is None:
+            segments = []
+            try:
+                names = os.listdir(self.archive_dir)
+            except FileNotFoundError:
+                names = []
+            for name in names:
+                if name.startswith(self._segment_prefix) and name.endswith(ARCHIVE_SUFFIX):
+                    try:
+                        start, stop = name[len(self._segment_prefix):-len(ARCHIVE_SUFFIX)].split("-")
+                        segments.append((int(start), int(stop), os.path.join(self.archive_dir, name)))
+                    except ValueError:
+                        pass
+            self._segments = sorted(segments)
+        return self._segments
+
+    @property
+    def first(self):
+        # The oldest record still kept raw.
+        segments = self.segments()
+        return segments[0][0] if segments else self.base
+
+    def disk_usage(self):
+        return os.path.getsize(self.path) + sum(os.path.getsize(path) for _, _, path in self.segments())
+
+    def should_rotate(self):
+        n = self._live_len()
+        if n == 0:
+            return False
+        if self.rotate_bytes and HEADER_SIZE + n * RECORD.size >= self.rotate_bytes:
+            return True
+        if self.rotate_age:
+            if self._first_time is None:
+                with open(self.path, "rb") as f:
+                    f.seek(HEADER_SIZE)
+                    self._first_time = RECORD.unpack(f.read(RECORD.size))[0]
+            return time.time() - self._first_time >= self.rotate_age
+        return False
+
+    def maybe_rotate(self):
+        return self.rotate() if self.should_rotate() else None
+
+    def rotate(self):
+        # Compresses the live rounds into a new segment and starts an empty
+        # live file after them. Returns the segment's path.
+        stop = len(self)
+        if stop == self.base:
+            return None
+        self.close()
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{self._segment_prefix}{self.base:012d}-{stop:012d}{ARCHIVE_SUFFIX}")
+        tmp_path = path + ".tmp"
+        count = stop - self.base
+        with open(self.path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=ARCHIVE_COMPRESSLEVEL) as dst:
+            src.seek(HEADER_SIZE)
+            first_time = RECORD.unpack(src.read(RECORD.size))[0]
+            src.seek(HEADER_SIZE + (count - 1) * RECORD.size)
+            last_time = RECORD.unpack(src.read(RECORD.size))[0]
+            dst.write(SEGMENT_HEADER.pack(LOG_MAGIC, LOG_VERSION, RECORD.size, self.seed, self.seed_start,
+                                          self.base, first_time, last_time))
+            src.seek(HEADER_SIZE)
+            while count > 0:
+                n = min(READ_CHUNK, count)
+                dst.write(src.read(n * RECORD.size))
+                count -= n
+        os.replace(tmp_path, path)
+        self._segments = None
+        self._replace_live(stop)
+        return path
+
+    def _replace_live(self, base):
+        # Rewrites the live file to start at record `base`, keeping any later rounds.
+        self.close()
+        skip = base - self.base
+        tmp_path = self.path + ".tmp"
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            dst.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, RECORD.size, self.seed, self.seed_start, base))
+            src.seek(HEADER_SIZE + skip * RECORD.size)
+            dst.write(src.read(max(self._live_len() - skip, 0) * RECORD.size))
+        os.replace(tmp_path, self.path)
+        self.base = base
+        self._first_time = None
+
+    def drop_segments(self, stop):
+        # Deletes the archived segments that end at or before `stop`; call
+        # once their rounds are rolled into the compacted summaries.
+        for _, segment_stop, path in self.segments():
+            if segment_stop <= stop:
+                os.remove(path)
+        self._segments = None
+
+    # Reading
+    def _map(self):
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def records(self):
+        # Every raw record from `first` on, in memory at once. With nothing
+        # archived this is a zero-copy view of the live file (the array keeps
+        # the mapping alive); otherwise the segments are decompressed and
+        # joined, so use iter_chunks() where memory should stay bounded.
+        import numpy as np
+        if not self.segments():
+            n = self._live_len()
+            if n == 0:
+                return np.empty(0, dtype=record_dtype())
+            return np.frombuffer(self._map(), dtype=record_dtype(), count=n, offset=HEADER_SIZE)
+        return np.concatenate(list(self.iter_chunks()) or [np.empty(0, dtype=record_dtype())])
+
+    def _spans(self, start, stop):
+        # (file positioned at `start`, record count) for each stored piece of
+        # [start, stop): archived segments, then the live file. Starts no
+        # earlier than `first`.
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = max(start, self.first)
+        for segment_start, segment_stop, path in self.segments():
+            if start >= min(stop, segment_stop):
+                continue
+            try:
+                f = gzip.open(path, "rb")
+            except FileNotFoundError:
+                # Compacted (on the log writer thread) since it was listed.
+                start = segment_stop
+                continue
+            with f:
+                f.seek(HEADER_SIZE + (start - segment_start) * RECORD.size)
+                yield f, min(stop, segment_stop) - start
+            start = segment_stop
+        if start < stop:
+            with open(self.path, "rb") as f:
+                base = HEADER.unpack(f.read(HEADER_SIZE))[5]
+                if start >= base:
+                    f.seek(HEADER_SIZE + (start - base) * RECORD.size)
+                    yield f, stop - start
+                    return
+            # Rotated (on the log writer thread) while we read: the rest is archived now.
+            yield from self._spans(start, stop)
+
+    def iter_records(self, start=0, stop=None):
+        # Reads in fixed-size chunks, so memory stays constant however big the log is.
+        for f, count in self._spans(start, stop):
+            yield from _read_records(f, count)
+
+    def iter_chunks(self, start=0, stop=None):
+        # The same records as numpy arrays of up to READ_CHUNK records each.
+        for f, count in self._spans(start, stop):
+            yield from _read_chunks(f, count)
+
+    def record(self, i):
+        for record in self.iter_records(i, i + 1):
+            return record
+        raise IndexError(f"record {i} is not in {self.path}")
+
+    def segment_times(self, path):
+        # (first, last) timestamp of an archived segment, from its header;
+        # (0, 0) for segments archived before headers kept them.
+        if path not in self._segment_times:
+            with gzip.open(path, "rb") as f:
+                self._segment_times[path] = SEGMENT_HEADER.unpack(f.read(HEADER_SIZE))[6:8]
+        return self._segment_times[path]
+
+    def find_time(self, timestamp):
+        # Records are appended in time order, so the first record at or after
+        # timestamp is found by binary search on the live file's fixed-width
+        # layout. For earlier times, segment headers pick the one segment to
+        # search, a chunk at a time.
+        lo, hi = 0, self._live_len()
+        if hi:
+            mm = self._map()
+            try:
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if struct.unpack_from("<d", mm, HEADER_SIZE + mid * RECORD.size)[0] < timestamp:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+            finally:
+                mm.close()
+        if lo == 0 and self.segments():
+            import numpy as np
+            for segment_start, segment_stop, path in self.segments():
+                last_time = self.segment_times(path)[1]
+                if last_time and last_time < timestamp:
+                    continue
+                i = segment_start
+                for chunk in self.iter_chunks(segment_start, segment_stop):
+                    j = int(np.searchsorted(chunk["timestamp"], timestamp))
+                    if j < len(chunk):
+                        return i + j
+                    i += len(chunk)
+        return self.base + lo
+
+    def rows(self):
+        return [decode_record(r) for r in self.iter_records()]
+
+# Background writer
+# The UI thread only queues finished records; a writer thread groups them into
+# one write per batch (batch_size records or max_delay seconds, whichever comes
+# first) and fsyncs every fsync_every records (0 leaves it to the OS).
+# on_commit(records) runs on the writer thread after each batch is written.
+# The log is rotated on the same thread, so it never races an append, but only
+# once any flush() waiting on the batch has been released; on_rotate(path)
+# runs after each rotation.
+SESSION_START = "session start"
+
+class LogWriter:
+    def __init__(self, log, batch_size=256, max_delay=0.5, fsync_every=0, on_commit=None, on_rotate=None):
+        self.log = log
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.fsync_every = fsync_every
+        self.on_commit = on_commit
+        self.on_rotate = on_rotate
+        self._unsynced = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="game-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, p, c, result, mode, player_score, computer_score, streak, timestamp=None):
+        record = make_record(p, c, result, mode, player_score, computer_score, streak, timestamp)
+        self._queue.put(record)
+        return record
+
+    def start_session(self):
+        # Marks the next appended record as the first of a new session.
+        self._queue.put(SESSION_START)
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.log.close()
+
+    def _commit(self, batch, sync=False):
+        if not batch:
+            return
+        self._unsynced += len(batch)
+        sync = sync or (self.fsync_every and self._unsynced >= self.fsync_every)
+        try:
+            self.log.write_records(batch, sync=sync)
+            if sync:
+                self._unsynced = 0
+            if self.on_commit:
+                self.on_commit(batch)
+        except Exception as e:
+            print(f"Error writing game log: {e}")
+
+    def _rotate(self):
+        # Committed rounds are on disk and summarised already, so a failure
+        # here only delays rotation.
+        try:
+            path = self.log.maybe_rotate()
+            if path and self.on_rotate:
+                self.on_rotate(path)
+        except Exception as e:
+            print(f"Error rotating game log: {e}")
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._commit(batch)
+                batch = []
+                self._rotate()
+                continue
+            if isinstance(item, tuple):
+                if not batch:
+                    deadline = time.monotonic() + self.max_delay
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._commit(batch)
+                    batch = []
+                    self._rotate()
+                continue
+            self._commit(batch, sync=bool(self.fsync_every))
+            batch = []
+            if item is None:
+                return
+            if item is SESSION_START:
+                try:
+                    self.log.mark_session()
+                except Exception as e:
+                    print(f"Error marking session start: {e}")
+            else:
+                item.set()
+            self._rotate()
+
+# CSV import/export for the old game_log.csv format
+def import_csv(csv_path, log):
+    imported = 0
+    batch = []
+    with open(csv_path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                timestamp = datetime.strptime(row["Timestamp"], CSV_TIME_FORMAT).timestamp()
+                batch.append(encode_round(row["Player"], row["Computer"], row["Result"], row["Mode"],
+                                          int(row["Player Score"]), int(row["Computer Score"]),
+                                          int(row["Streak"]), timestamp))
+            except (KeyError, ValueError) as e:
+                print(f"Skipping bad log row {row}: {e}")
+                continue
+            if len(batch) >= 10000:
+                log.append_many(batch)
+                imported += len(batch)
+                batch = []
+    if batch:
+        log.append_many(batch)
+        imported += len(batch)
+    return imported
+
+def export_csv(log, csv_path):
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for record in log.iter_records():
+            row = decode_record(record)
+            writer.writerow([row[k] for k in CSV_HEADER])
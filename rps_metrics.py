@@ -0,0 +1,218 @@
+# Opt-in latency instrumentation.
+# Set RPS_PROFILE=1 to record timings into fixed-size log-scale histograms
+# (about 9% resolution from 1 us to well over an hour), reported as count,
+# mean, p50, p90, p99 and max per phase. RPS_PROFILE_FILE sets where the
+# report is written when the game quits (default latency_report.json next to
+# the game) and RPS_PROFILE_PORT has the game serve the live
+# report as JSON on 127.0.0.1. Only the game starts that server (serve_env);
+# importing this module never does.
+#
+# When profiling is off, `profiler` is a NullProfiler whose methods do
+# nothing, so instrumented code pays one no-op call per phase.
+#
+#   RPS_PROFILE=1 RPS_PROFILE_PORT=9100 python DansRockPaperScissors.py
+#   curl 127.0.0.1:9100/metrics
+#   python rps_metrics.py latency_report.json
+import json
+import math
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MIN_SECONDS = 1e-6
+STEPS_PER_OCTAVE = 8
+BUCKETS = 32 * STEPS_PER_OCTAVE
+PERCENTILES = (50, 90, 99)
+# A Tk event stamped more than this after the best offset seen between Tk's
+# clock and ours means the clocks moved (Tk's wraps every 49 days).
+EVENT_SLACK = 10.0
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        if seconds > MIN_SECONDS:
+            i = min(int(math.log2(seconds / MIN_SECONDS) * STEPS_PER_OCTAVE), BUCKETS - 1)
+        else:
+            i = 0
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-th percentile, capped at the max.
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * q / 100)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(MIN_SECONDS * 2 ** ((i + 1) / STEPS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        summary = {"count": self.count, "mean": self.total / self.count if self.count else 0.0}
+        for q in PERCENTILES:
+            summary[f"p{q}"] = self.percentile(q)
+        summary["max"] = self.max
+        return summary
+
+class _Timer:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+class Profiler:
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._event_offset = None
+
+    def clock(self):
+        return time.perf_counter()
+
+    def event_clock(self, event_ms):
+        # Converts a Tk event's time (milliseconds on the X server's clock) to
+        # ours, so input latency includes the wait in Tk's event queue. The
+        # smallest gap seen between the clocks is taken as their offset.
+        offset = time.perf_counter() - event_ms / 1000
+        if self._event_offset is None or not 0 <= offset - self._event_offset < EVENT_SLACK:
+            self._event_offset = offset
+        return event_ms / 1000 + self._event_offset
+
+    def record(self, name, seconds):
+        # Sounds load on a worker thread, so recording takes a lock.
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def lap(self, name, since):
+        # Records the time since `since` and returns now, for chaining phases.
+        now = time.perf_counter()
+        self.record(name, now - since)
+        return now
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def report(self):
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def dump(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        profiler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(profiler.report(), indent=2).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="profile-server", daemon=True).start()
+        print(f"Profiling metrics on http://{host}:{self._server.server_address[1]}/metrics")
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server = None
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+class NullProfiler:
+    enabled = False
+    _timer = _NullTimer()
+
+    def clock(self):
+        return 0.0
+
+    def event_clock(self, event_ms):
+        return 0.0
+
+    def record(self, name, seconds):
+        pass
+
+    def lap(self, name, since):
+        return 0.0
+
+    def timer(self, name):
+        return self._timer
+
+    def report(self):
+        return {}
+
+    def dump(self, path):
+        pass
+
+    def serve(self, port, host="127.0.0.1"):
+        pass
+
+    def close(self):
+        pass
+
+def from_env(environ=os.environ):
+    if environ.get("RPS_PROFILE", "") in ("", "0"):
+        return NullProfiler()
+    return Profiler()
+
+def serve_env(profiler, environ=os.environ):
+    port = environ.get("RPS_PROFILE_PORT")
+    if port and profiler.enabled:
+        try:
+            profiler.serve(int(port))
+        except (OSError, ValueError) as e:
+            print(f"Error starting metrics endpoint: {e}")
+
+REPORT_FILE = "latency_report.json"
+report_path = (os.environ.get("RPS_PROFILE_FILE")
+               or os.path.join(os.path.dirname(os.path.abspath(__file__)), REPORT_FILE))
+profiler = from_env()
+
+def print_report(report):
+    print(f"{'Phase':<32}{'Count':>8}{'Mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'Max':>10}")
+    for name, s in report.items():
+        cells = "".join(f"{s[key] * 1000:>10.2f}" for key in ("mean", "p50", "p90", "p99", "max"))
+        print(f"{name:<32}{s['count']:>8}{cells}")
+    print("(times in ms)")
+
+if __name__ == "__main__":
+    with open(sys.argv[1] if len(sys.argv) > 1 else report_path, "r") as f:
+        print_report(json.load(f))
@@ -0,0 +1,271 @@
+# Named player profiles, each stored in its own shard.
+# profiles/<slug>-<hash>/ holds one player's game_log.bin, game_stats.json and
+# game_leaderboard.json, so a player's stats and leaderboards are their own
+# maintained summaries (no scans), and resetting or deleting a player only
+# touches that directory. The combined leaderboard merges each profile's top K
+# boards rather than reading any logs. The hash is of the exact name, so
+# names that slug alike ("Ana", "ana", "李", "José") never share a shard, and
+# a shard whose profile.json names someone else is never opened.
+#
+# A profile's log rotates into compressed segments once the live file gets
+# big or old (see rps_log.py). Past KEEP_ARCHIVES segments, the oldest are
+# compacted: their rounds are rolled into the archive's compacted stats and
+# leaderboard, which rebuilds start from, and the raw segments are deleted.
+# The player's own stats and leaderboard already include those rounds, so
+# history is kept while disk use and rebuild time stay bounded.
+#
+#   python rps_profiles.py list|check|rebuild|rotate|compact [name]
+#   python rps_profiles.py reset|delete name
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+from rps_engine import SessionRng
+from rps_leaderboard import ALL_MODES, COMPACTED_LEADERBOARD_FILE, Leaderboard
+from rps_log import GameLog, import_csv
+from rps_stats import COMPACTED_STATS_FILE, GameStats
+
+DEFAULT_PROFILE = "Player"
+PROFILE_FILE = "profile.json"
+LOG_FILE = "game_log.bin"
+STATS_FILE = "game_stats.json"
+LEADERBOARD_FILE = "game_leaderboard.json"
+# Log rotation and retention
+ROTATE_BYTES = 32 << 20
+ROTATE_AGE = 30 * 24 * 3600
+KEEP_ARCHIVES = 12
+
+def profile_slug(name):
+    # Readable part (Unicode letters and digits kept) plus a hash of the exact name.
+    readable = re.sub(r"[^\w-]+", "-", name.strip().lower()).strip("-_")[:40] or "player"
+    return f"{readable}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+def legacy_slug(name):
+    # Shard names from before the hash was added.
+    return re.sub(r"[^a-z0-9_-]+", "-", name.strip().lower()).strip("-") or "player"
+
+def stored_name(path):
+    try:
+        with open(os.path.join(path, PROFILE_FILE), "r") as f:
+            return json.load(f)["name"]
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+class Profile:
+    def __init__(self, name, path, leaderboard_size=5):
+        self.name = name
+        self.path = path
+        self.log = GameLog(os.path.join(path, LOG_FILE), ROTATE_BYTES, ROTATE_AGE)
+        self.stats = GameStats(os.path.join(path, STATS_FILE))
+        self.leaderboard = Leaderboard(os.path.join(path, LEADERBOARD_FILE), leaderboard_size)
+        # commit() runs on the log writer thread; hold this to read stats or
+        # the leaderboard from another thread without seeing a half-applied batch.
+        self.lock = threading.Lock()
+
+    def sync(self):
+        self.stats.sync(self.log)
+        self.leaderboard.sync(self.log)
+
+    def start_session(self):
+        # Marks the next record as a session start and returns the session's
+        # rng positioned there; call with all rounds written.
+        seed = self.log.ensure_seed()
+        self.log.mark_session()
+        return SessionRng(seed, len(self.log))
+
+    def commit(self, records):
+        # Called once the records are on disk in this profile's log. Only this
+        # thread changes the summaries, so saving needs no lock.
+        with self.lock:
+            for record in records:
+                self.stats.add_record(record)
+                self.leaderboard.add_record(record)
+        self.stats.save()
+        self.leaderboard.save()
+
+    def rotated(self, path=None):
+        # Called after the log rotates (LogWriter's on_rotate), off the commit
+        # path so compacting never holds up a flush.
+        if len(self.log.segments()) > KEEP_ARCHIVES:
+            self.compact()
+
+    def compact(self, keep=None):
+        # Rolls all but the newest `keep` (default KEEP_ARCHIVES) archived segments
+        # into the compacted summaries, then deletes them. Returns the number
+        # of rounds compacted.
+        keep = KEEP_ARCHIVES if keep is None else keep
+        segments = self.log.segments()
+        if len(segments) <= keep:
+            return 0
+        first, stop = self.log.first, segments[len(segments) - keep - 1][1]
+        compacted = (GameStats(os.path.join(self.log.archive_dir, COMPACTED_STATS_FILE)),
+                     Leaderboard(os.path.join(self.log.archive_dir, COMPACTED_LEADERBOARD_FILE), self.leaderboard.k))
+        for summary in compacted:
+            if summary.rounds < first:
+                raise ValueError(f"{summary.path} covers {summary.rounds} rounds but the log's raw rounds start "
+                                 f"at {first}; not compacting so no more rounds are lost")
+            # A summary already past `first` was saved by a compaction that
+            # stopped before deleting its segments.
+            for record in self.log.iter_records(summary.rounds, stop):
+                summary.add_record(record)
+            summary.save()
+        self.log.drop_segments(stop)
+        return stop - first
+
+    def reset(self):
+        # Stats and leaderboard record how many log rounds they cover, so if
+        # we stop between these steps the next open rebuilds them from the log.
+        self.log.reset()
+        with self.lock:
+            self.stats.clear()
+            self.leaderboard.clear()
+        self.stats.save()
+        self.leaderboard.save()
+
+class ProfileStore:
+    def __init__(self, root, leaderboard_size=5):
+        self.root = root
+        self.leaderboard_size = leaderboard_size
+
+    def path(self, name):
+        path = os.path.join(self.root, profile_slug(name))
+        if not os.path.exists(path):
+            # Shards from before hashed slugs are used only if they are this player's.
+            legacy = os.path.join(self.root, legacy_slug(name))
+            if stored_name(legacy) == name:
+                return legacy
+        return path
+
+    def _create(self, name):
+        path = self.path(name)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, PROFILE_FILE), "w") as f:
+            json.dump({"name": name}, f)
+        return path
+
+    def names(self):
+        names = []
+        try:
+            entries = sorted(os.scandir(self.root), key=lambda e: e.name)
+        except FileNotFoundError:
+            return names
+        for entry in entries:
+            name = stored_name(entry.path)
+            if name is not None:
+                names.append(name)
+        return names
+
+    def open(self, name):
+        # Opens the profile, creating it if needed, and brings its summaries up to date.
+        path = self.path(name)
+        existing = stored_name(path)
+        if existing is None:
+            if os.path.exists(os.path.join(path, LOG_FILE)):
+                raise ValueError(f"{path} holds a game log but no readable {PROFILE_FILE}")
+            self._create(name)
+        elif existing != name:
+            raise ValueError(f"{path} belongs to profile {existing!r}, not {name!r}")
+        profile = Profile(name, path, self.leaderboard_size)
+        profile.sync()
+        # Saved so the combined leaderboard sees what sync caught up on.
+        profile.commit([])
+        return profile
+
+    def delete(self, name):
+        shutil.rmtree(self.path(name))
+
+    def migrate(self, base_dir, name=DEFAULT_PROFILE):
+        # Moves a single shared log (and its summaries) from before profiles
+        # into the default profile, or imports an old game_log.csv into it.
+        if self.names():
+            return
+        path = self.path(name)
+        moved = False
+        for file_name in (LOG_FILE, STATS_FILE, LEADERBOARD_FILE):
+            old_path = os.path.join(base_dir, file_name)
+            if os.path.exists(old_path):
+                self._create(name)
+                os.replace(old_path, os.path.join(path, file_name))
+                moved = True
+        csv_path = os.path.join(base_dir, "game_log.csv")
+        if not moved and os.path.exists(csv_path):
+            self._create(name)
+            try:
+                print(f"Imported {import_csv(csv_path, GameLog(os.path.join(path, LOG_FILE)))} rounds from game_log.csv")
+            except Exception as e:
+                print(f"Error importing game_log.csv: {e}")
+        if moved:
+            print(f"Moved the game log into profile '{name}'")
+
+    def top(self, mode=ALL_MODES, current=None):
+        # Best streaks across all profiles as (name, record); `current` is an
+        # open Profile whose in-memory board is newer than its file.
+        entries = []
+        for name in self.names():
+            if current is not None and name == current.name:
+                with current.lock:
+                    top = current.leaderboard.top(mode)
+            else:
+                top = Leaderboard(os.path.join(self.path(name), LEADERBOARD_FILE), self.leaderboard_size).top(mode)
+            entries.extend((name, record) for record in top)
+        return heapq.nlargest(self.leaderboard_size, entries, key=lambda e: (e[1][7], -e[1][0]))
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    store = ProfileStore(os.path.join(base_dir, "profiles"))
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    known = store.names()
+    unknown = [name for name in sys.argv[2:] if name not in known]
+    if unknown:
+        print(f"Unknown profile: {', '.join(unknown)}")
+        sys.exit(2)
+    names = sys.argv[2:] or known
+    if command == "list":
+        for name in names:
+            try:
+                log = GameLog(os.path.join(store.path(name), LOG_FILE), create=False)
+            except (OSError, ValueError) as e:
+                print(f"{name}: Error opening game log: {e}")
+                continue
+            print(f"{name}: {len(log)} rounds, {len(log) - log.first} kept raw in {len(log.segments())} archived "
+                  f"segments and the live log ({log.disk_usage():,} bytes)")
+    elif command in ("check", "rebuild", "rotate", "compact", "reset", "delete"):
+        if command in ("reset", "delete") and len(sys.argv) < 3:
+            print(f"Usage: rps_profiles.py {command} name")
+            sys.exit(2)
+        stale = False
+        for name in names:
+            if command == "delete":
+                store.delete(name)
+                print(f"Deleted profile '{name}'.")
+                continue
+            profile = Profile(name, store.path(name), store.leaderboard_size)
+            if command == "check":
+                mismatched = profile.stats.check(profile.log)
+                mismatched += [f"leaderboard {name}" for name in profile.leaderboard.check(profile.log)]
+                stale = stale or bool(mismatched)
+                print(f"{name}: " + (f"out of date: {', '.join(mismatched)}" if mismatched else f"consistent with {len(profile.log)} rounds"))
+            elif command == "rebuild":
+                profile.stats.rebuild(profile.log)
+                profile.leaderboard.rebuild(profile.log)
+                profile.commit([])
+                print(f"{name}: rebuilt from {profile.stats.rounds} rounds.")
+            elif command == "rotate":
+                path = profile.log.rotate()
+                print(f"{name}: archived to {path}" if path else f"{name}: nothing to archive")
+                if path:
+                    profile.rotated(path)
+            elif command == "compact":
+                print(f"{name}: compacted {profile.compact()} rounds")
+            else:
+                profile.reset()
+                print(f"Reset profile '{name}'.")
+        if stale:
+            sys.exit(1)
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(2)
@@ -0,0 +1,184 @@
+# Streaming reports over the game log.
+# Everything here is a generator over GameLog.iter_records, which reads the file
+# in fixed-size chunks, so reports run in constant memory on logs of any size.
+# Date ranges are found by binary search (GameLog.find_time) rather than by
+# scanning, and groups are emitted as soon as they close because the log is in
+# time order.
+#
+#   python rps_query.py summary [--player Name] [--mode Hard] [--since 2025-01-01] [--until 2025-02-01]
+#   python rps_query.py daily|hourly
+#   python rps_query.py rolling --window 100 [--every 1000]
+#   python rps_query.py transitions [--by-result]
+import argparse
+import os
+import sys
+from collections import deque
+from datetime import datetime, timedelta
+from rps_engine import choices, modes, results
+from rps_log import CSV_TIME_FORMAT, GameLog, mode_codes, result_codes
+from rps_profiles import DEFAULT_PROFILE, LOG_FILE, ProfileStore
+
+WIN = result_codes["You Win"]
+LOSE = result_codes["You Lose"]
+DRAW = result_codes["Draw"]
+PERIODS = ("hour", "day")
+
+# Sources
+def scan(log, since=None, until=None, mode=None):
+    # Records with since <= timestamp < until, optionally for one mode.
+    start = log.find_time(since) if since is not None else 0
+    stop = log.find_time(until) if until is not None else None
+    records = log.iter_records(start, stop)
+    if mode is not None:
+        code = mode_codes[mode]
+        records = (r for r in records if r[4] == code)
+    return records
+
+# Aggregates
+class Tally:
+    def __init__(self):
+        self.counts = [0, 0, 0]
+
+    def add(self, result):
+        self.counts[result] += 1
+
+    @property
+    def rounds(self):
+        return sum(self.counts)
+
+    @property
+    def wins(self):
+        return self.counts[WIN]
+
+    @property
+    def losses(self):
+        return self.counts[LOSE]
+
+    @property
+    def draws(self):
+        return self.counts[DRAW]
+
+    @property
+    def win_rate(self):
+        return self.wins / self.rounds * 100 if self.rounds else 0.0
+
+def totals(records):
+    tally = Tally()
+    for record in records:
+        tally.add(record[3])
+    return tally
+
+def period_bounds(timestamp, period):
+    start = datetime.fromtimestamp(timestamp)
+    if period == "hour":
+        start = start.replace(minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=1)
+    else:
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+    return start.timestamp(), end.timestamp()
+
+def group_by(records, period="day"):
+    # Yields (period start, Tally) for each local hour or day that has rounds.
+    if period not in PERIODS:
+        raise ValueError(f"unknown period {period!r} (use {' or '.join(PERIODS)})")
+    lo = hi = None
+    tally = None
+    for record in records:
+        timestamp = record[0]
+        if tally is None or not lo <= timestamp < hi:
+            if tally is not None:
+                yield lo, tally
+            lo, hi = period_bounds(timestamp, period)
+            tally = Tally()
+        tally.add(record[3])
+    if tally is not None:
+        yield lo, tally
+
+def rolling_win_rate(records, window=100):
+    # Yields (timestamp, win rate %) over the last `window` rounds after each round.
+    recent = deque()
+    wins = 0
+    for record in records:
+        won = record[3] == WIN
+        recent.append(won)
+        wins += won
+        if len(recent) > window:
+            wins -= recent.popleft()
+        yield record[0], wins / len(recent) * 100
+
+def transitions(records, by_result=False):
+    # counts[i][j]: rounds where the player followed move i with move j. With
+    # by_result, one matrix per result of the first round (win-stay/lose-shift).
+    matrices = [[[0] * 3 for _ in range(3)] for _ in range(3 if by_result else 1)]
+    previous = None
+    for record in records:
+        if previous is not None:
+            matrix = matrices[previous[3] if by_result else 0]
+            matrix[previous[1]][record[1]] += 1
+        previous = record
+    return {results[i]: m for i, m in enumerate(matrices)} if by_result else matrices[0]
+
+# Reports
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime(CSV_TIME_FORMAT)
+
+def parse_time(text):
+    for fmt in (CSV_TIME_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD[ HH:MM[:SS]], got {text!r}")
+
+def print_tally_header(label):
+    print(f"{label:<20}{'Rounds':>10}{'Wins':>10}{'Losses':>10}{'Draws':>10}{'Win %':>8}")
+
+def print_tally(label, tally):
+    print(f"{label:<20}{tally.rounds:>10}{tally.wins:>10}{tally.losses:>10}{tally.draws:>10}{tally.win_rate:>8.1f}")
+
+def print_matrix(matrix):
+    print(f"{'':<10}" + "".join(f"{'→ ' + c:>12}" for c in choices))
+    for i, row in enumerate(matrix):
+        print(f"{choices[i]:<10}" + "".join(f"{n:>12}" for n in row))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reports over the Rock Paper Scissors game log")
+    parser.add_argument("report", choices=["summary", "hourly", "daily", "rolling", "transitions"])
+    parser.add_argument("--player", default=DEFAULT_PROFILE, help="profile whose log to read")
+    parser.add_argument("--log", help="read this log file instead of a profile's")
+    parser.add_argument("--mode", choices=modes)
+    parser.add_argument("--since", type=parse_time, help="first date/time to include")
+    parser.add_argument("--until", type=parse_time, help="first date/time to exclude")
+    parser.add_argument("--window", type=int, default=100, help="rounds in the rolling window")
+    parser.add_argument("--every", type=int, default=0, help="print every Nth rolling value (default: --window)")
+    parser.add_argument("--by-result", action="store_true", help="split transitions by the previous result")
+    args = parser.parse_args()
+
+    store = ProfileStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+    log_path = args.log or os.path.join(store.path(args.player), LOG_FILE)
+    try:
+        log = GameLog(log_path, create=False)
+    except (OSError, ValueError) as e:
+        print(f"Error opening game log: {e}")
+        sys.exit(2)
+    records = scan(log, args.since, args.until, args.mode)
+    if args.report == "summary":
+        print_tally_header("")
+        print_tally("All", totals(records))
+    elif args.report in ("hourly", "daily"):
+        period = "hour" if args.report == "hourly" else "day"
+        print_tally_header("Hour" if period == "hour" else "Day")
+        for start, tally in group_by(records, period):
+            print_tally(format_time(start)[:16 if period == "hour" else 10], tally)
+    elif args.report == "rolling":
+        every = args.every or args.window
+        print(f"{'Time':<20}{'Win %':>8}")
+        for i, (timestamp, rate) in enumerate(rolling_win_rate(records, args.window), 1):
+            if i % every == 0:
+                print(f"{format_time(timestamp):<20}{rate:>8.1f}")
+    else:
+        matrices = transitions(records, args.by_result)
+        for result, matrix in (matrices.items() if args.by_result else [("All rounds", matrices)]):
+            print(f"After {result}:" if args.by_result else f"{result}:")
+            print_matrix(matrix)
@@ -0,0 +1,165 @@
+# Headless replay of logged sessions.
+# Streams a game log through the engine with no GUI or sound. From the log's
+# first seeded record on, the computer's Easy and Hard moves are regenerated
+# from the session seed and checked against the log (Adaptive moves depend on
+# the predictor's history and are taken from the log). Every round is re-scored
+# with the current rules to check results, scores and streaks, and optionally
+# with a Match subclass to see how historical sessions score under new rules.
+#
+# Sessions start at the records listed in the log's session markers (written
+# when the app starts a new Match). Before a log's first marker, sessions are
+# guessed: scores never go down within one, so a drop in either score starts one.
+# Replays start at the log's oldest raw record; compacted rounds are skipped.
+#
+#   python rps_replay.py [--player Name | --log game_log.bin] [--rules mymodule:MyMatch]
+import argparse
+import importlib
+import os
+import time
+from rps_engine import Match, SessionRng, computer_move, modes
+from rps_log import GameLog, NO_MODE
+from rps_profiles import DEFAULT_PROFILE, LOG_FILE, ProfileStore
+from rps_rules import DRAW, WIN
+
+ADAPTIVE = modes.index("Adaptive")
+
+class ReplayReport:
+    def __init__(self):
+        self.rounds = 0
+        self.sessions = 0
+        self.moves_checked = 0
+        self.move_mismatches = 0
+        self.result_mismatches = 0
+        self.score_mismatches = 0
+        self.first_mismatch = None
+        # Final scores summed over sessions, as logged and as re-scored.
+        self.logged_points = [0, 0]
+        self.rescored_points = [0, 0]
+        self.rescored_best_streak = 0
+
+    @property
+    def ok(self):
+        return not (self.move_mismatches or self.result_mismatches or self.score_mismatches)
+
+    def mismatch(self, index):
+        if self.first_mismatch is None:
+            self.first_mismatch = index
+
+def _end_session(report, logged, rescore):
+    report.logged_points[0] += logged[0]
+    report.logged_points[1] += logged[1]
+    report.rescored_points[0] += rescore.scores["player"]
+    report.rescored_points[1] += rescore.scores["computer"]
+    report.rescored_best_streak = max(report.rescored_best_streak, rescore.best_streak)
+
+def _power_up_after(log, i, session_starts=()):
+    # The power-up turns on with a third straight win, off with a loss, and
+    # survives draws, so it is read from the session's last win or loss up to record i.
+    while i >= log.first:
+        record = log.record(i)
+        if record[3] != DRAW:
+            return record[3] == WIN and record[7] >= 3
+        if i in session_starts:
+            break
+        i -= 1
+    return False
+
+def _adopt(check, player_score, computer_score, streak, power_up):
+    check.scores = {"player": player_score, "computer": computer_score}
+    check.win_streak = streak
+    check.power_up_active = power_up
+
+def replay(log, rules=Match, start=0, stop=None):
+    report = ReplayReport()
+    rng = SessionRng(log.seed)
+    check = Match()
+    rescore = rules()
+    logged = (0, 0)
+    start = max(start, log.first)
+    session_starts = set(log.session_starts())
+    marked_from = min(session_starts) if session_starts else len(log)
+    # With no record before `start` to pick up from, the first round's logged
+    # state is taken as is.
+    adopt_first = start == log.first > 0
+    if log.first < start < len(log) and start not in session_starts:
+        # Pick up the session in progress (re-scoring starts from zero).
+        previous = log.record(start - 1)
+        _adopt(check, previous[5], previous[6], previous[7], _power_up_after(log, start - 1, session_starts))
+    # The power-up state the log implies, kept for resyncing after a mismatch.
+    logged_power = check.power_up_active
+    for i, (timestamp, p, c, result, mode, player_score, computer_score, streak) in enumerate(
+            log.iter_records(start, stop), start):
+        if i >= marked_from:
+            new_session = i in session_starts
+        else:
+            new_session = player_score < check.scores["player"] or computer_score < check.scores["computer"]
+        if new_session:
+            if report.rounds:
+                _end_session(report, logged, rescore)
+                report.sessions += 1
+            check.reset()
+            rescore.reset()
+            logged_power = False
+        if log.seed and i >= log.seed_start and mode != NO_MODE and mode != ADAPTIVE:
+            rng.seek(i)
+            report.moves_checked += 1
+            if computer_move(p, modes[mode], rng) != c:
+                report.move_mismatches += 1
+                report.mismatch(i)
+        if check.score_round(p, c) != result:
+            report.result_mismatches += 1
+            report.mismatch(i)
+        if result != DRAW:
+            logged_power = result == WIN and streak >= 3
+        if (check.scores["player"], check.scores["computer"], check.win_streak) != (player_score, computer_score, streak):
+            if not adopt_first:
+                report.score_mismatches += 1
+                report.mismatch(i)
+            # Carry on from the logged state so one bad round is reported once.
+            _adopt(check, player_score, computer_score, streak, logged_power)
+        rescore.mode = modes[mode] if mode != NO_MODE else None
+        rescore.score_round(p, c)
+        logged = (player_score, computer_score)
+        report.rounds += 1
+        adopt_first = False
+    if report.rounds:
+        _end_session(report, logged, rescore)
+        report.sessions += 1
+    return report
+
+def load_rules(spec):
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"expected module:Class, got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def print_report(report, elapsed):
+    print(f"{report.rounds:,} rounds in {report.sessions:,} sessions replayed in {elapsed:.2f}s "
+          f"({report.rounds / max(elapsed, 1e-9):,.0f} rounds/s)")
+    print(f"Computer moves checked: {report.moves_checked:,}, mismatched: {report.move_mismatches:,}")
+    print(f"Result mismatches: {report.result_mismatches:,}, score/streak mismatches: {report.score_mismatches:,}")
+    if report.first_mismatch is not None:
+        print(f"First mismatch at record {report.first_mismatch}")
+    print(f"Logged points: {report.logged_points[0]:,}-{report.logged_points[1]:,}, "
+          f"re-scored: {report.rescored_points[0]:,}-{report.rescored_points[1]:,} "
+          f"(best streak {report.rescored_best_streak})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay and verify a Rock Paper Scissors game log")
+    parser.add_argument("--player", default=DEFAULT_PROFILE, help="profile whose log to replay")
+    parser.add_argument("--log", help="replay this log file instead of a profile's")
+    parser.add_argument("--rules", help="module:Class of a Match subclass to re-score with")
+    parser.add_argument("--start", type=int, default=0, help="first record to replay")
+    parser.add_argument("--stop", type=int, default=None, help="record to stop before")
+    args = parser.parse_args()
+    store = ProfileStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+    try:
+        log = GameLog(args.log or os.path.join(store.path(args.player), LOG_FILE), create=False)
+    except (OSError, ValueError) as e:
+        print(f"Error opening game log: {e}")
+        raise SystemExit(2)
+    start = time.perf_counter()
+    report = replay(log, load_rules(args.rules) if args.rules else Match, args.start, args.stop)
+    print_report(report, time.perf_counter() - start)
+    if not report.ok:
+        raise SystemExit(1)
@@ -0,0 +1,92 @@
+# Game variants described as data.
+# A variant is its list of move names and, for each move, the moves it beats.
+# Moves are small ints (their index in the list) and everything a round needs
+# is precomputed into flat tables, so the engine, the adaptive AI and the batch
+# simulator all score a round with the same constant-time lookups:
+#
+#   outcome[p * n + c]   DRAW/WIN/LOSE from the player's side (flat, for numpy)
+#   table[p][c]          the same as rows (fastest from Python)
+#   counters[p]          moves that beat p (Hard mode's usual reply)
+#   victims[p]           moves that p beats (Hard mode's occasional miss)
+#
+# Variants can also be loaded from JSON: {"name": ..., "moves": [...],
+# "beats": {"move": ["beaten", ...]}} or {"name": ..., "cyclic": [...]}.
+
+DRAW, WIN, LOSE = 0, 1, 2
+RESULTS = ["Draw", "You Win", "You Lose"]
+# Chance that Hard mode plays a counter to the player's move.
+HARD_HIT_RATE = 0.66
+
+class Variant:
+    def __init__(self, name, moves, beats):
+        self.name = name
+        self.moves = list(moves)
+        self.n = n = len(self.moves)
+        self.codes = {move: i for i, move in enumerate(self.moves)}
+        if len(self.codes) != n:
+            raise ValueError(f"{name}: moves must have different names")
+        unknown = sorted({m for move, beaten in beats.items() for m in [move, *beaten] if m not in self.codes})
+        if unknown:
+            raise ValueError(f"{name}: unknown moves {', '.join(map(str, unknown))}")
+        wins = [[False] * n for _ in range(n)]
+        for move, beaten in beats.items():
+            for other in beaten:
+                wins[self.codes[move]][self.codes[other]] = True
+        for p in range(n):
+            for c in range(n):
+                if p != c and wins[p][c] == wins[c][p]:
+                    raise ValueError(f"{name}: exactly one of {self.moves[p]} and {self.moves[c]} must beat the other")
+        self.outcome = [DRAW if p == c else WIN if wins[p][c] else LOSE for p in range(n) for c in range(n)]
+        self.table = [self.outcome[p * n:(p + 1) * n] for p in range(n)]
+        self.counters = [[c for c in range(n) if wins[c][p]] for p in range(n)]
+        self.victims = [[c for c in range(n) if wins[p][c]] for p in range(n)]
+        # Balanced variants (every move beats as many as it loses to) let the
+        # batch simulator use rectangular tables.
+        self.balanced = len({len(row) for row in self.counters + self.victims}) == 1
+
+    def __repr__(self):
+        return f"Variant({self.name!r}, {self.n} moves)"
+
+    def result(self, p, c):
+        return self.table[p][c]
+
+    def hard_reply(self, p, draw):
+        # One draw picks hit or miss and, when there are several, which move.
+        options = self.counters[p] if draw < HARD_HIT_RATE else self.victims[p]
+        if len(options) == 1:
+            return options[0]
+        if draw < HARD_HIT_RATE:
+            i = int(draw / HARD_HIT_RATE * len(options))
+        else:
+            i = int((draw - HARD_HIT_RATE) / (1 - HARD_HIT_RATE) * len(options))
+        return options[min(i, len(options) - 1)]
+
+def cyclic(name, moves):
+    # Odd-sized cyclic game: each move beats the (n - 1) / 2 moves before it.
+    n = len(moves)
+    if n < 3 or n % 2 == 0:
+        raise ValueError(f"{name}: a cyclic variant needs an odd number of moves (at least 3)")
+    return Variant(name, moves, {moves[i]: [moves[(i - k) % n] for k in range(1, (n - 1) // 2 + 1)]
+                                 for i in range(n)})
+
+def from_dict(data):
+    if "cyclic" in data:
+        return cyclic(data["name"], data["cyclic"])
+    return Variant(data["name"], data["moves"], data["beats"])
+
+def load_variant(path):
+    # json is imported here to keep it off the engine's import time.
+    import json
+    with open(path, "r") as f:
+        return from_dict(json.load(f))
+
+CLASSIC = Variant("Rock Paper Scissors", ["rock", "paper", "scissors"],
+                  {"rock": ["scissors"], "paper": ["rock"], "scissors": ["paper"]})
+RPSLS = Variant("Rock Paper Scissors Lizard Spock", ["rock", "paper", "scissors", "lizard", "spock"], {
+    "rock": ["scissors", "lizard"],
+    "paper": ["rock", "spock"],
+    "scissors": ["paper", "lizard"],
+    "lizard": ["spock", "paper"],
+    "spock": ["scissors", "rock"],
+})
+variants = {"classic": CLASSIC, "rpsls": RPSLS}
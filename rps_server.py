@@ -0,0 +1,319 @@
+# Network match server built on the game engine.
+# Line-delimited JSON over TCP. A client sends {"op": "join"} to be paired with
+# the next waiting player, or {"op": "join", "mode": "Easy"} to play the
+# computer. Each round both players send {"op": "move", "round": n, "move": m};
+# moves are held by the server until both sides have committed, so neither can
+# see the other's choice first. Joining with "notify_commit": true also sends
+# {"op": "committed"} when the opponent has moved (without the move), at the
+# cost of an extra message per round. Scores, streaks and power-ups follow
+# Match.get_result from each player's own side. A match ends when a player
+# leaves, when "rounds" rounds have been played, or when a player does not move
+# within the move timeout (the opponent, or the computer, wins by forfeit).
+#
+#   python rps_server.py serve [--host 127.0.0.1] [--port 8765]
+#   python rps_server.py bots [--clients 1000] [--rounds 100] [--mode Easy]
+import argparse
+import asyncio
+import json
+import random
+import time
+from rps_engine import Match, choices, modes
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MOVE_TIMEOUT = 30.0
+WRITE_BUFFER_LIMIT = 64 * 1024
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+class Player:
+    def __init__(self, writer, name):
+        self.writer = writer
+        self.name = name
+        self.duel = None
+        self.solo = None
+        self.solo_timer = None
+        self.notify_commit = False
+
+    def send(self, msg):
+        if not self.writer.is_closing():
+            self.writer.write(encode(msg))
+
+    def state(self, match):
+        return {"score": match.scores["player"], "streak": match.win_streak,
+                "best_streak": match.best_streak, "power_up": match.power_up_active}
+
+class Duel:
+    def __init__(self, server, a, b, rounds, move_timeout):
+        self.server = server
+        self.players = [a, b]
+        self.matches = [Match(), Match()]
+        self.rounds = rounds
+        self.move_timeout = move_timeout
+        self.round = 1
+        self.moves = [None, None]
+        self.timer = None
+        self.over = False
+        for side, player in enumerate(self.players):
+            player.duel = self
+            player.send({"op": "start", "opponent": self.players[1 - side].name, "rounds": rounds})
+        self._arm_timer()
+
+    def _arm_timer(self):
+        if self.timer:
+            self.timer.cancel()
+        if self.move_timeout:
+            self.timer = asyncio.get_running_loop().call_later(self.move_timeout, self._timed_out)
+
+    def _timed_out(self):
+        # Whoever has not committed forfeits; if neither has, it is a draw.
+        missing = [side for side in (0, 1) if self.moves[side] is None]
+        winner = None if len(missing) != 1 else 1 - missing[0]
+        self.end("timeout", winner)
+
+    def side_of(self, player):
+        return self.players.index(player)
+
+    def submit(self, player, round_no, move):
+        side = self.side_of(player)
+        if round_no != self.round:
+            player.send({"op": "error", "error": f"expected round {self.round}"})
+        elif move not in choices:
+            player.send({"op": "error", "error": f"bad move {move!r}"})
+        elif self.moves[side] is not None:
+            player.send({"op": "error", "error": "move already committed"})
+        else:
+            self.moves[side] = move
+            if self.moves[1 - side] is None:
+                if self.players[1 - side].notify_commit:
+                    self.players[1 - side].send({"op": "committed", "round": self.round})
+            else:
+                self.resolve()
+
+    def resolve(self):
+        a, b = self.moves
+        results = [self.matches[0].get_result(a, b), self.matches[1].get_result(b, a)]
+        for side, player in enumerate(self.players):
+            msg = {"op": "result", "round": self.round, "you": self.moves[side], "opponent": self.moves[1 - side],
+                   "result": results[side], "opponent_score": self.matches[1 - side].scores["player"]}
+            msg.update(player.state(self.matches[side]))
+            player.send(msg)
+        self.server.rounds_played += 1
+        self.moves = [None, None]
+        if self.rounds and self.round >= self.rounds:
+            scores = [m.scores["player"] for m in self.matches]
+            self.end("complete", None if scores[0] == scores[1] else scores.index(max(scores)))
+            return
+        self.round += 1
+        self._arm_timer()
+
+    def end(self, reason, winner=None):
+        if self.over:
+            return
+        self.over = True
+        if self.timer:
+            self.timer.cancel()
+        for side, player in enumerate(self.players):
+            player.duel = None
+            player.send({"op": "end", "reason": reason, "winner": None if winner is None else winner == side,
+                         "score": self.matches[side].scores["player"],
+                         "opponent_score": self.matches[1 - side].scores["player"]})
+        self.server.duels.discard(self)
+
+class MatchServer:
+    def __init__(self, rounds=0, move_timeout=MOVE_TIMEOUT):
+        self.rounds = rounds
+        self.move_timeout = move_timeout
+        self.waiting = None
+        self.duels = set()
+        self.rounds_played = 0
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        player = Player(writer, f"player{self.connections}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writers = self.writers(player)
+                try:
+                    msg = json.loads(line)
+                    self.dispatch(player, msg)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    player.send({"op": "error", "error": str(e)})
+                # Only wait on slow readers; draining after every message
+                # costs a scheduler round trip per line. A move also writes
+                # to the opponent, so a client that stops reading slows its
+                # opponent's moves instead of growing the server's buffers.
+                for peer in writers | self.writers(player):
+                    if peer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                        try:
+                            await peer.drain()
+                        except ConnectionError:
+                            if peer is writer:
+                                raise
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(player)
+            writer.close()
+
+    def writers(self, player):
+        # The connections a message from this player can write to.
+        if player.duel:
+            return {p.writer for p in player.duel.players}
+        return {player.writer}
+
+    def dispatch(self, player, msg):
+        op = msg["op"]
+        if op == "join":
+            self.join(player, msg)
+        elif op == "move":
+            if player.duel:
+                player.duel.submit(player, msg["round"], msg["move"])
+            elif player.solo:
+                self.play_solo(player, msg["round"], msg["move"])
+            else:
+                player.send({"op": "error", "error": "not in a match"})
+        elif op == "leave":
+            self.leave(player)
+        else:
+            player.send({"op": "error", "error": f"unknown op {op!r}"})
+
+    def join(self, player, msg):
+        if player.duel or player.solo or self.waiting is player:
+            player.send({"op": "error", "error": "already joined"})
+            return
+        player.name = msg.get("name") or player.name
+        player.notify_commit = bool(msg.get("notify_commit"))
+        mode = msg.get("mode")
+        if mode:
+            if mode not in modes:
+                player.send({"op": "error", "error": f"unknown mode {mode!r}"})
+                return
+            player.solo = Match(mode)
+            player.send({"op": "start", "opponent": f"computer ({mode})", "rounds": self.rounds})
+            self._arm_solo_timer(player)
+        elif self.waiting is None:
+            self.waiting = player
+            player.send({"op": "waiting"})
+        else:
+            opponent, self.waiting = self.waiting, None
+            self.duels.add(Duel(self, opponent, player, self.rounds, self.move_timeout))
+
+    def play_solo(self, player, round_no, move):
+        match = player.solo
+        if round_no != match.game_count + 1 or move not in choices:
+            player.send({"op": "error", "error": f"expected round {match.game_count + 1} and a valid move"})
+            return
+        computer, result = match.play(move)
+        msg = {"op": "result", "round": round_no, "you": move, "opponent": computer, "result": result,
+               "opponent_score": match.scores["computer"]}
+        msg.update(player.state(match))
+        player.send(msg)
+        self.rounds_played += 1
+        if self.rounds and match.game_count >= self.rounds:
+            self.end_solo(player, "complete")
+        else:
+            self._arm_solo_timer(player)
+
+    def _arm_solo_timer(self, player):
+        if player.solo_timer:
+            player.solo_timer.cancel()
+        if self.move_timeout:
+            player.solo_timer = asyncio.get_running_loop().call_later(
+                self.move_timeout, self.end_solo, player, "timeout")
+
+    def end_solo(self, player, reason):
+        # A player who runs out of time forfeits to the computer.
+        match = player.solo
+        player.solo = None
+        if player.solo_timer:
+            player.solo_timer.cancel()
+            player.solo_timer = None
+        msg = {"op": "end", "reason": reason, "score": match.scores["player"],
+               "opponent_score": match.scores["computer"]}
+        if reason == "timeout":
+            msg["winner"] = False
+        player.send(msg)
+
+    def leave(self, player):
+        if self.waiting is player:
+            self.waiting = None
+        if player.duel:
+            duel = player.duel
+            duel.end("left", 1 - duel.side_of(player))
+        if player.solo_timer:
+            player.solo_timer.cancel()
+            player.solo_timer = None
+        player.solo = None
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+# Bot client for load testing
+async def bot(host, port, rounds, mode=None, seed=None):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    join = {"op": "join"}
+    if mode:
+        join["mode"] = mode
+    writer.write(encode(join))
+    played = 0
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return played
+            if json.loads(line)["op"] == "start":
+                break
+        for round_no in range(1, rounds + 1):
+            writer.write(encode({"op": "move", "round": round_no, "move": choices[int(rng.random() * 3)]}))
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return played
+                msg = json.loads(line)
+                if msg["op"] == "result":
+                    played += 1
+                    break
+                if msg["op"] in ("end", "error"):
+                    return played
+    finally:
+        writer.close()
+    return played
+
+async def run_bots(host, port, clients, rounds, mode=None):
+    if not mode and clients % 2:
+        raise ValueError("player-vs-player bots need an even number of clients")
+    start = time.perf_counter()
+    played = await asyncio.gather(*(bot(host, port, rounds, mode, seed=i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    # In player-vs-player matches each round is seen by both bots.
+    total = sum(played) if mode else sum(played) // 2
+    print(f"{clients} clients played {total} rounds in {elapsed:.2f}s ({total / elapsed:,.0f} rounds/s)")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock Paper Scissors match server")
+    parser.add_argument("command", choices=["serve", "bots"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rounds", type=int, default=100, help="rounds per match (serve: 0 = unlimited)")
+    parser.add_argument("--timeout", type=float, default=MOVE_TIMEOUT, help="seconds allowed per move")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--mode", choices=modes, help="bots play the computer in this mode")
+    args = parser.parse_args()
+    try:
+        if args.command == "serve":
+            asyncio.run(MatchServer(args.rounds, args.timeout).serve(args.host, args.port))
+        else:
+            asyncio.run(run_bots(args.host, args.port, args.clients, args.rounds, args.mode))
+    except KeyboardInterrupt:
+        pass
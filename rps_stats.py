@@ -0,0 +1,186 @@
+# Incrementally maintained stats for the Stats screen.
+# Counters are updated in O(1) per logged round and saved next to the game log,
+# so showing stats never has to scan the log. "rounds" records how many log
+# records the counters cover, which lets a stale file catch up from the log tail.
+# Rounds compacted out of the log's archive are kept as a GameStats of their
+# own (COMPACTED_STATS_FILE in the archive), which rebuild() starts from.
+import json
+import os
+import sys
+from rps_engine import choices, modes, results
+from rps_log import GameLog, NO_MODE, result_codes
+
+STATS_VERSION = 1
+COMPACTED_STATS_FILE = "compacted_stats.json"
+
+class GameStats:
+    def __init__(self, path=None):
+        self.path = path
+        self.clear()
+        if path:
+            self.load()
+
+    def clear(self):
+        self.rounds = 0
+        self.results = [0] * len(results)
+        self.by_mode = {m: [0] * len(results) for m in modes}
+        self.player_moves = [0] * len(choices)
+        self.move_pairs = [[0] * len(choices) for _ in choices]
+
+    # Updates
+    def add(self, p, c, result, mode):
+        self.rounds += 1
+        self.results[result] += 1
+        if mode != NO_MODE:
+            self.by_mode[modes[mode]][result] += 1
+        self.player_moves[p] += 1
+        self.move_pairs[p][c] += 1
+
+    def add_record(self, record):
+        self.add(record[1], record[2], record[3], record[4])
+
+    # Derived values
+    @property
+    def total_games(self):
+        return self.rounds
+
+    @property
+    def wins(self):
+        return self.results[result_codes["You Win"]]
+
+    @property
+    def losses(self):
+        return self.results[result_codes["You Lose"]]
+
+    @property
+    def draws(self):
+        return self.results[result_codes["Draw"]]
+
+    @property
+    def win_rate(self):
+        return (self.wins / self.rounds * 100) if self.rounds > 0 else 0
+
+    @property
+    def favorite_choice(self):
+        if not self.rounds:
+            return "None"
+        return choices[max(range(len(choices)), key=self.player_moves.__getitem__)]
+
+    # Persistence
+    def to_dict(self):
+        return {
+            "version": STATS_VERSION,
+            "rounds": self.rounds,
+            "results": dict(zip(results, self.results)),
+            "by_mode": {m: dict(zip(results, counts)) for m, counts in self.by_mode.items()},
+            "player_moves": dict(zip(choices, self.player_moves)),
+            "move_pairs": {p: dict(zip(choices, row)) for p, row in zip(choices, self.move_pairs)},
+        }
+
+    def from_dict(self, data):
+        self.clear()
+        self.rounds = data["rounds"]
+        self.results = [data["results"][r] for r in results]
+        for m in modes:
+            counts = data["by_mode"].get(m, {})
+            self.by_mode[m] = [counts.get(r, 0) for r in results]
+        self.player_moves = [data["player_moves"][p] for p in choices]
+        self.move_pairs = [[data["move_pairs"][p][c] for c in choices] for p in choices]
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                self.from_dict(json.load(f))
+        except FileNotFoundError:
+            self.clear()
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error loading stats, starting empty: {e}")
+            self.clear()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, self.path)
+
+    # Recovery
+    def sync(self, log):
+        # Apply log records written after the last save (e.g. after a crash).
+        n = len(log)
+        if self.rounds > n or self.rounds < log.first:
+            self.rebuild(log)
+            return
+        for record in log.iter_records(self.rounds):
+            self.add_record(record)
+
+    def rebuild(self, log):
+        import numpy as np
+        self.clear()
+        start = log.first
+        if start:
+            # Rounds before `first` only exist in the compacted stats, which may
+            # run ahead of it if compaction stopped before deleting segments.
+            compacted = GameStats(os.path.join(log.archive_dir, COMPACTED_STATS_FILE))
+            if not start <= compacted.rounds <= len(log):
+                raise ValueError(f"compacted stats cover {compacted.rounds} rounds but the log's raw rounds "
+                                 f"start at {start}; restore {COMPACTED_STATS_FILE} or reset the profile")
+            self.from_dict(compacted.to_dict())
+            start = compacted.rounds
+
+        # Counted a chunk at a time, so memory stays bounded however long the log is.
+        k, r = len(choices), len(results)
+        result_counts = np.zeros(r, dtype=np.int64)
+        mode_counts = np.zeros((len(modes), r), dtype=np.int64)
+        move_counts = np.zeros(k, dtype=np.int64)
+        pair_counts = np.zeros(k * k, dtype=np.int64)
+        rounds = 0
+        for chunk in log.iter_chunks(start):
+            rounds += len(chunk)
+            result_counts += np.bincount(chunk["result"], minlength=r)
+            for code in range(len(modes)):
+                mode_counts[code] += np.bincount(chunk["result"][chunk["mode"] == code], minlength=r)
+            move_counts += np.bincount(chunk["player"], minlength=k)
+            pair_counts += np.bincount(chunk["player"].astype(np.intp) * k + chunk["computer"], minlength=k * k)
+
+        def plus(counts, more):
+            return [a + b for a, b in zip(counts, more.tolist())]
+        self.rounds = start + rounds
+        self.results = plus(self.results, result_counts)
+        for code, m in enumerate(modes):
+            self.by_mode[m] = plus(self.by_mode[m], mode_counts[code])
+        self.player_moves = plus(self.player_moves, move_counts)
+        self.move_pairs = [plus(row, more) for row, more in zip(self.move_pairs, pair_counts.reshape(k, k))]
+
+    def check(self, log):
+        expected = GameStats()
+        expected.rebuild(log)
+        mine, theirs = self.to_dict(), expected.to_dict()
+        return [key for key in mine if mine[key] != theirs[key]]
+
+if __name__ == "__main__":
+    # python rps_stats.py rebuild|check [game_log.bin] [game_stats.json]
+    # Defaults to the default player's profile; see rps_profiles.py for all players.
+    from rps_profiles import DEFAULT_PROFILE, LOG_FILE, STATS_FILE, ProfileStore
+    profile_dir = ProfileStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")).path(DEFAULT_PROFILE)
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    log_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(profile_dir, LOG_FILE)
+    stats_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(profile_dir, STATS_FILE)
+    try:
+        log = GameLog(log_path, create=False)
+    except (OSError, ValueError) as e:
+        print(f"Error opening game log: {e}")
+        sys.exit(2)
+    stats = GameStats(stats_path)
+    if command == "rebuild":
+        stats.rebuild(log)
+        stats.save()
+        print(f"Rebuilt stats from {stats.rounds} rounds.")
+    elif command == "check":
+        mismatched = stats.check(log)
+        if mismatched:
+            print(f"Stats out of date: {', '.join(mismatched)} (run 'rebuild')")
+            sys.exit(1)
+        print(f"Stats consistent with {len(log)} rounds.")
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(2)
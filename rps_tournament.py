@@ -0,0 +1,237 @@
+# Multi-core tournament runner for computer strategies.
+# Strategies are named by spec strings: the built-ins "easy", "hard" and
+# "adaptive", or "module:function" for a user bot called as
+# function(rng, own_history, opponent_history) -> move name. Specs (not
+# objects) are sent to worker processes, so user bots only need to be
+# importable there.
+#
+# Each task plays a block of games for one pairing in a worker process and
+# returns only totals; rounds never leave the worker. Every game gets its own
+# random.Random seeded from (tournament seed, pairing, game), the same kind of
+# rng get_computer_choice draws from, so results do not depend on the number
+# of workers or on scheduling.
+#
+# "hard" reacts to the opponent's move of the same round like Hard mode does;
+# against another reactive strategy the first side has nothing to react to
+# and moves at random.
+#
+#   python rps_tournament.py easy hard adaptive [mybots:copycat] --format swiss
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from rps_ai import Predictor
+from rps_engine import Match, choices, get_computer_choice
+
+# Strategies
+class EasyStrategy:
+    reactive = False
+
+    def choose(self, rng, opponent_move=None):
+        return get_computer_choice(None, "Easy", rng)
+
+    def observe(self, own, opponent):
+        pass
+
+class HardStrategy:
+    reactive = True
+
+    def choose(self, rng, opponent_move=None):
+        if opponent_move is None:
+            return get_computer_choice(None, "Easy", rng)
+        return get_computer_choice(opponent_move, "Hard", rng)
+
+    def observe(self, own, opponent):
+        pass
+
+class AdaptiveStrategy:
+    reactive = False
+
+    def __init__(self):
+        self.ai = Predictor()
+
+    def choose(self, rng, opponent_move=None):
+        return choices[self.ai.choose(rng)]
+
+    def observe(self, own, opponent):
+        # The predictor models the other side as "the player".
+        self.ai.observe(choices.index(opponent), choices.index(own))
+
+class FunctionStrategy:
+    reactive = False
+
+    def __init__(self, function):
+        self.function = function
+        self.own = []
+        self.opponent = []
+
+    def choose(self, rng, opponent_move=None):
+        return self.function(rng, self.own, self.opponent)
+
+    def observe(self, own, opponent):
+        self.own.append(own)
+        self.opponent.append(opponent)
+
+builtin_strategies = {"easy": EasyStrategy, "hard": HardStrategy, "adaptive": AdaptiveStrategy}
+
+def make_strategy(spec):
+    if spec in builtin_strategies:
+        return builtin_strategies[spec]()
+    module_name, _, function_name = spec.partition(":")
+    if not function_name:
+        raise ValueError(f"unknown strategy {spec!r} (use a built-in name or module:function)")
+    return FunctionStrategy(getattr(importlib.import_module(module_name), function_name))
+
+# Games
+def play_game(spec_a, spec_b, rounds, rng):
+    a, b = make_strategy(spec_a), make_strategy(spec_b)
+    match_a, match_b = Match(), Match()
+    totals = [0, 0, 0]
+    for _ in range(rounds):
+        if a.reactive and not b.reactive:
+            move_b = b.choose(rng)
+            move_a = a.choose(rng, move_b)
+        else:
+            move_a = a.choose(rng)
+            move_b = b.choose(rng, move_a if b.reactive else None)
+        result = match_a.get_result(move_a, move_b)
+        match_b.get_result(move_b, move_a)
+        totals[0 if result == "You Win" else 1 if result == "You Lose" else 2] += 1
+        a.observe(move_a, move_b)
+        b.observe(move_b, move_a)
+    # a wins, b wins, draws, a points, b points
+    return totals[0], totals[1], totals[2], match_a.scores["player"], match_b.scores["player"]
+
+def game_seed(seed, pairing, game):
+    return f"{seed}:{pairing}:{game}"
+
+def run_block(task):
+    spec_a, spec_b, rounds, seed, pairing, first_game, games = task
+    block = [0, 0, 0, 0, 0, 0, 0]
+    for game in range(first_game, first_game + games):
+        a_wins, b_wins, draws, a_points, b_points = play_game(spec_a, spec_b, rounds,
+                                                              random.Random(game_seed(seed, pairing, game)))
+        block[0] += a_wins
+        block[1] += b_wins
+        block[2] += draws
+        block[3] += a_points
+        block[4] += b_points
+        # Game results: a won, b won (draws are the remainder)
+        block[5] += a_points > b_points
+        block[6] += b_points > a_points
+    return pairing, block
+
+# Tournaments
+class Standings:
+    def __init__(self, specs):
+        # Rows are keyed by spec, so each strategy may be entered once.
+        self.specs = list(specs)
+        duplicates = sorted({spec for spec in self.specs if self.specs.count(spec) > 1})
+        if duplicates:
+            raise ValueError(f"strategies entered more than once: {', '.join(duplicates)}")
+        self.table = {spec: {"games": 0, "game_wins": 0, "game_draws": 0, "rounds": 0, "wins": 0, "losses": 0,
+                             "draws": 0, "points": 0, "match_points": 0.0} for spec in self.specs}
+        self.played = set()
+
+    def record(self, spec_a, spec_b, games, block):
+        a_wins, b_wins, draws, a_points, b_points, a_games, b_games = block
+        for spec, wins, losses, points, won, lost in ((spec_a, a_wins, b_wins, a_points, a_games, b_games),
+                                                      (spec_b, b_wins, a_wins, b_points, b_games, a_games)):
+            row = self.table[spec]
+            row["games"] += games
+            row["game_wins"] += won
+            row["game_draws"] += games - won - lost
+            row["rounds"] += wins + losses + draws
+            row["wins"] += wins
+            row["losses"] += losses
+            row["draws"] += draws
+            row["points"] += points
+        # A pairing is worth 1 match point, split by games won.
+        decided = a_games + b_games
+        share = 0.5 if decided == 0 else a_games / decided
+        self.table[spec_a]["match_points"] += share
+        self.table[spec_b]["match_points"] += 1 - share
+        self.played.add(frozenset((spec_a, spec_b)))
+
+    def ranking(self):
+        return sorted(self.specs, key=lambda s: (self.table[s]["match_points"], self.table[s]["points"]), reverse=True)
+
+def play_pairings(executor, workers, pairings, games, rounds, seed, standings, offset=0):
+    # Split each pairing's games into blocks so all workers stay busy.
+    blocks_per_pairing = max(1, (workers * 4 + len(pairings) - 1) // max(len(pairings), 1))
+    block_size = max(1, -(-games // blocks_per_pairing))
+    tasks = []
+    for i, (spec_a, spec_b) in enumerate(pairings):
+        for first in range(0, games, block_size):
+            tasks.append((spec_a, spec_b, rounds, seed, offset + i, first, min(block_size, games - first)))
+    totals = {i: [0] * 7 for i in range(len(pairings))}
+    for pairing, block in executor.map(run_block, tasks, chunksize=1):
+        total = totals[pairing - offset]
+        for k, value in enumerate(block):
+            total[k] += value
+    for i, (spec_a, spec_b) in enumerate(pairings):
+        standings.record(spec_a, spec_b, games, totals[i])
+
+def round_robin(specs, games=100, rounds=1000, seed=0, workers=None):
+    workers = workers or os.cpu_count()
+    standings = Standings(specs)
+    pairings = [(a, b) for i, a in enumerate(specs) for b in specs[i + 1:]]
+    with ProcessPoolExecutor(workers) as executor:
+        play_pairings(executor, workers, pairings, games, rounds, seed, standings)
+    return standings
+
+def swiss_pairings(standings):
+    # Pair neighbours in the current ranking, skipping rematches where possible.
+    remaining = standings.ranking()
+    pairings = []
+    while len(remaining) > 1:
+        a = remaining.pop(0)
+        partner = next((b for b in remaining if frozenset((a, b)) not in standings.played), remaining[0])
+        remaining.remove(partner)
+        pairings.append((a, partner))
+    return pairings
+
+def swiss(specs, swiss_rounds=3, games=100, rounds=1000, seed=0, workers=None):
+    workers = workers or os.cpu_count()
+    standings = Standings(specs)
+    with ProcessPoolExecutor(workers) as executor:
+        for swiss_round in range(swiss_rounds):
+            pairings = swiss_pairings(standings)
+            play_pairings(executor, workers, pairings, games, rounds, seed, standings, offset=swiss_round * len(specs))
+    return standings
+
+def print_standings(standings):
+    print(f"{'Strategy':<24}{'MP':>7}{'Games W-D-L':>16}{'Rounds W-D-L':>26}{'Points':>12}")
+    for spec in standings.ranking():
+        row = standings.table[spec]
+        games = f"{row['game_wins']}-{row['game_draws']}-{row['games'] - row['game_wins'] - row['game_draws']}"
+        rounds = f"{row['wins']}-{row['draws']}-{row['losses']}"
+        print(f"{spec:<24}{row['match_points']:>7.1f}{games:>16}{rounds:>26}{row['points']:>12}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock Paper Scissors strategy tournament")
+    parser.add_argument("strategies", nargs="+", help="easy, hard, adaptive or module:function")
+    parser.add_argument("--format", choices=["round-robin", "swiss"], default="round-robin")
+    parser.add_argument("--swiss-rounds", type=int, default=3)
+    parser.add_argument("--games", type=int, default=100, help="games per pairing")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds per game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        Standings(args.strategies)
+    except ValueError as e:
+        parser.error(str(e))
+    for spec in args.strategies:
+        make_strategy(spec)
+    start = time.perf_counter()
+    if args.format == "swiss":
+        result = swiss(args.strategies, args.swiss_rounds, args.games, args.rounds, args.seed, args.workers)
+    else:
+        result = round_robin(args.strategies, args.games, args.rounds, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    total_rounds = sum(row["rounds"] for row in result.table.values()) // 2
+    print_standings(result)
+    print(f"{total_rounds:,} rounds in {elapsed:.2f}s ({total_rounds / elapsed:,.0f} rounds/s)")
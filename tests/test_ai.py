@@ -0,0 +1,48 @@
+import random
+from rps_ai import MAX_COUNTS, Predictor
+from rps_engine import Match, SessionRng, modes
+from rps_log import GameLog
+from rps_rules import cyclic
+
+def test_move_does_not_depend_on_this_round():
+    # The reply is chosen before the player's move is seen.
+    match = Match("Adaptive", SessionRng(5))
+    for p in [0, 0, 1, 0, 0, 1, 0, 0, 1, 2] * 5:
+        replies = set()
+        for candidate in range(3):
+            match.rng.seek(match.game_count)
+            replies.add(match.computer_move(candidate))
+        assert len(replies) == 1
+        match.rng.seek(match.game_count)
+        match.play_round(p)
+
+def test_predicts_a_repeated_move():
+    match = Match("Adaptive", random.Random(1))
+    for _ in range(30):
+        match.play_round(0)
+    assert match.ai.predict() == 0
+
+def test_learns_only_from_adaptive_rounds():
+    match = Match("Adaptive", random.Random(1))
+    match.play_round(0)
+    match.mode = "Hard"
+    match.play_round(1)
+    assert match.ai.rounds == 1
+
+def test_warm_start_skips_other_modes(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    adaptive, hard = modes.index("Adaptive"), modes.index("Hard")
+    log.write_records([(0.0, 0, 1, 2, adaptive if i % 3 == 0 else hard, 0, i, 0) for i in range(30)])
+    ai = Predictor()
+    ai.warm_start(log)
+    assert ai.rounds == 10
+    ai = Predictor()
+    ai.warm_start(log, limit=6)
+    assert ai.rounds == 2
+
+def test_big_variants_drop_large_models():
+    variant = cyclic("Big", [f"move{i}" for i in range(101)])
+    ai = Predictor(variant=variant)
+    assert all(len(model.counts) <= MAX_COUNTS for model in ai.models)
+    assert [(model.order, model.with_outcome) for model in ai.models] == [(0, False), (1, False), (2, False),
+                                                                          (1, True)]
@@ -0,0 +1,68 @@
+import pytest
+import rps_anim
+from rps_anim import Animator
+
+class FakeRoot:
+    # Stands in for Tk: jobs run only when the test says so.
+    def __init__(self):
+        self.jobs = {}
+        self.delays = []
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.delays.append(ms)
+        self.next_id += 1
+        self.jobs[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def run_jobs(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rps_anim.time, "perf_counter", lambda: now[0])
+    return now
+
+def test_one_timer_for_all_animations(clock):
+    root = FakeRoot()
+    animator = Animator(root)
+    animator.play("a", [(0, lambda: None), (50, lambda: None)])
+    animator.play("b", [(0, lambda: None)])
+    assert len(root.jobs) == 1
+
+def test_replacing_an_animation_drops_its_frames(clock):
+    root = FakeRoot()
+    animator = Animator(root)
+    seen = []
+    animator.play("input", [(0, lambda: seen.append("first"))])
+    animator.play("input", [(0, lambda: seen.append("second"))])
+    root.run_jobs()
+    assert seen == ["second"]
+    assert not root.jobs
+
+def test_missed_frames_are_skipped(clock):
+    root = FakeRoot()
+    animator = Animator(root)
+    seen = []
+    animator.play("shake", [(ms, lambda ms=ms: seen.append(ms)) for ms in (0, 10, 20, 30)])
+    clock[0] += 0.025
+    root.run_jobs()
+    assert seen == [20]
+    clock[0] += 0.010
+    root.run_jobs()
+    assert seen == [20, 30]
+    assert not animator.animations and not root.jobs
+
+def test_ticks_are_at_least_a_frame_apart(clock):
+    root = FakeRoot()
+    animator = Animator(root, fps=10)
+    animator.play("a", [(0, lambda: None), (1, lambda: None)])
+    root.run_jobs()
+    # The 1 ms frame waits for the next 100 ms tick.
+    assert root.delays == [0, 100]
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from rps_batch import CHUNK, play_batch
+from rps_engine import Match
+from rps_rules import CLASSIC, RPSLS
+
+@pytest.mark.parametrize("mode", ["Easy", "Hard"])
+@pytest.mark.parametrize("variant", [CLASSIC, RPSLS])
+def test_play_batch_matches_score_round(mode, variant):
+    # Long enough to cross a chunk boundary, with streaks and power-ups.
+    n = CHUNK + 5000
+    moves = np.random.default_rng(1).integers(0, variant.n, n)
+    scalar = Match(mode, np.random.default_rng(7), variant)
+    rounds = []
+    for p in moves.tolist():
+        c, result = scalar.play_round(p)
+        rounds.append((c, result, scalar.scores["player"], scalar.scores["computer"], scalar.win_streak,
+                       scalar.power_up_active))
+
+    batched = Match(mode, np.random.default_rng(7), variant)
+    out = play_batch(batched, moves)
+    assert list(zip(out["computer"].tolist(), out["result"].tolist(), out["player_score"].tolist(),
+                    out["computer_score"].tolist(), out["streak"].tolist(), out["power_up"].tolist())) == rounds
+    assert (batched.scores, batched.win_streak, batched.best_streak, batched.power_up_active, batched.game_count) == \
+        (scalar.scores, scalar.win_streak, scalar.best_streak, scalar.power_up_active, scalar.game_count)
+
+def test_play_batch_rejects_adaptive():
+    with pytest.raises(ValueError):
+        play_batch(Match("Adaptive", np.random.default_rng(1)), [0, 1, 2])
@@ -0,0 +1,33 @@
+import pytest
+from rps_engine import Match
+from rps_rules import cyclic
+
+def state(match):
+    return (dict(match.scores), match.win_streak, match.best_streak, match.power_up_active, match.game_count)
+
+def test_undo_needs_history():
+    with pytest.raises(ValueError):
+        Match().undo()
+
+def test_undo_restores_every_round():
+    variant = cyclic("Nineteen", [f"move{i}" for i in range(19)])
+    match = Match("Easy", history=64, variant=variant)
+    rounds = [(0, 1), (0, 18), (0, 18), (0, 18), (0, 18), (3, 3), (0, 18), (0, 5), (18, 0)]
+    states = []
+    for p, c in rounds:
+        states.append(state(match))
+        match.score_round(p, c)
+    for (p, c), before in zip(reversed(rounds), reversed(states)):
+        assert match.undo()[:2] == (p, c)
+        assert state(match) == before
+
+def test_undo_restores_long_streak():
+    match = Match(history=4)
+    match.win_streak = match.best_streak = 70000
+    match.score_round(0, 1)
+    match.undo()
+    assert match.win_streak == 70000
+
+def test_history_rejects_too_many_moves():
+    with pytest.raises(ValueError):
+        Match(history=8, variant=cyclic("Big", [f"move{i}" for i in range(257)]))
@@ -0,0 +1,45 @@
+from rps_leaderboard import ALL_MODES, Leaderboard
+from rps_log import NO_MODE, GameLog
+
+def record(timestamp, streak, mode=0):
+    return (timestamp, 0, 2, 1, mode, 0, 0, streak)
+
+def test_keeps_top_k():
+    board = Leaderboard(k=3)
+    for i, streak in enumerate([4, 9, 1, 7, 3, 8]):
+        board.add_record(record(1000.0 + i, streak))
+    assert [r[7] for r in board.top()] == [9, 8, 7]
+
+def test_ties_go_to_the_earlier_round():
+    board = Leaderboard(k=2)
+    for timestamp in (3000.0, 1000.0, 2000.0):
+        board.add_record(record(timestamp, 5))
+    assert [r[0] for r in board.top()] == [1000.0, 2000.0]
+
+def test_per_mode_boards():
+    board = Leaderboard(k=5)
+    board.add_record(record(1.0, 3, mode=0))
+    board.add_record(record(2.0, 6, mode=1))
+    board.add_record(record(3.0, 9, mode=NO_MODE))
+    assert [r[7] for r in board.top(ALL_MODES)] == [9, 6, 3]
+    assert [r[7] for r in board.top("Easy")] == [3]
+    assert [r[7] for r in board.top("Hard")] == [6]
+
+def test_smaller_k_trims_and_larger_k_rebuilds(tmp_path):
+    path = str(tmp_path / "game_leaderboard.json")
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    records = [record(1000.0 + i, i % 11) for i in range(50)]
+    log.write_records(records)
+    board = Leaderboard(path, k=5)
+    board.sync(log)
+    board.save()
+
+    smaller = Leaderboard(path, k=2)
+    assert smaller.rounds == 50
+    assert smaller.top() == board.top()[:2]
+
+    larger = Leaderboard(path, k=8)
+    assert larger.rounds == -1
+    larger.sync(log)
+    assert larger.check(log) == []
+    assert len(larger.top()) == 8
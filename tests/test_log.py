@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+import pytest
+from rps_log import HEADER_SIZE, NO_MODE, RECORD, GameLog, LogWriter
+from rps_rules import WIN
+
+def fill(log, n, start_time=1000.0):
+    log.write_records([(start_time + i, i % 3, (i + 2) % 3, WIN, NO_MODE, i + 1, 0, i + 1) for i in range(n)])
+
+def test_rotate_and_reopen(tmp_path):
+    path = str(tmp_path / "game_log.bin")
+    log = GameLog(path)
+    fill(log, 100)
+    expected = list(log.iter_records())
+    assert log.rotate()
+    fill(log, 50, 2000.0)
+    expected += list(log.iter_records(100))
+    log.close()
+
+    log = GameLog(path)
+    assert len(log) == 150
+    assert log.base == 100
+    assert list(log.iter_records()) == expected
+    assert log.record(99) == expected[99]
+    assert log.find_time(2000.0) == 100
+
+def test_reopen_after_stopping_mid_rotation(tmp_path, monkeypatch):
+    # The segment is written but the live file still holds its rounds.
+    path = str(tmp_path / "game_log.bin")
+    log = GameLog(path)
+    fill(log, 100)
+    expected = list(log.iter_records())
+
+    def stop(self, base):
+        raise KeyboardInterrupt
+    with monkeypatch.context() as m:
+        m.setattr(GameLog, "_replace_live", stop)
+        with pytest.raises(KeyboardInterrupt):
+            log.rotate()
+
+    log = GameLog(path)
+    assert log.base == 100
+    assert len(log) == 100
+    assert list(log.iter_records()) == expected
+    fill(log, 1, 3000.0)
+    assert len(log) == 101
+    assert log.record(100)[0] == 3000.0
+
+def test_reopen_ignores_unfinished_segment(tmp_path):
+    path = str(tmp_path / "game_log.bin")
+    log = GameLog(path)
+    fill(log, 10)
+    log.close()
+    os.makedirs(log.archive_dir)
+    with open(os.path.join(log.archive_dir, "game_log.000000000000-000000000010.bin.gz.tmp"), "wb") as f:
+        f.write(b"partial")
+    log = GameLog(path)
+    assert log.segments() == []
+    assert len(log) == 10
+
+def test_readers_do_not_create_logs(tmp_path):
+    path = str(tmp_path / "missing.bin")
+    with pytest.raises(FileNotFoundError):
+        GameLog(path, create=False)
+    assert not os.path.exists(path)
+
+def test_append_drops_torn_tail(tmp_path):
+    path = str(tmp_path / "game_log.bin")
+    log = GameLog(path)
+    fill(log, 3)
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\xff" * 10)
+    log = GameLog(path)
+    assert len(log) == 3
+    fill(log, 1, 5000.0)
+    assert len(log) == 4
+    assert log.record(3) == (5000.0, 0, 2, WIN, NO_MODE, 1, 0, 1)
+    assert os.path.getsize(path) == HEADER_SIZE + 4 * RECORD.size
+
+def test_mark_session_drops_torn_tail(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    log.mark_session()
+    with open(log.sessions_path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    fill(log, 2)
+    log.mark_session()
+    assert log.session_starts() == [0, 2]
+
+def test_flush_does_not_wait_for_rotation(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"), rotate_bytes=1)
+    release = threading.Event()
+    rotate = log.maybe_rotate
+
+    def slow_rotate():
+        release.wait(5)
+        return rotate()
+    log.maybe_rotate = slow_rotate
+    rotated = []
+    writer = LogWriter(log, batch_size=1000, max_delay=10, on_rotate=rotated.append)
+    writer.append("rock", "paper", "You Lose", "Easy", 0, 1, 0)
+    start = time.monotonic()
+    writer.flush()
+    assert time.monotonic() - start < 1
+    release.set()
+    writer.close()
+    assert len(rotated) == 1
+    assert len(log) == 1 and log.base == 1
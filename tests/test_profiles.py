@@ -0,0 +1,58 @@
+import os
+import pytest
+import rps_profiles
+from rps_log import NO_MODE
+from rps_profiles import ProfileStore
+from rps_rules import LOSE, WIN
+
+def play_segments(profile, segments, per_segment=20):
+    streak = 0
+    for s in range(segments):
+        for i in range(per_segment):
+            result = WIN if (s + i) % 4 else LOSE
+            streak = streak + 1 if result == WIN else 0
+            record = (1000.0 + s * per_segment + i, 0, 2 if result == WIN else 1, result, NO_MODE, 0, 0, streak)
+            profile.log.write_records([record])
+            profile.commit([record])
+        profile.log.rotate()
+
+def test_compact_keeps_summaries(tmp_path):
+    profile = ProfileStore(str(tmp_path)).open("Tester")
+    play_segments(profile, 5)
+    stats, top = profile.stats.to_dict(), profile.leaderboard.top()
+    assert profile.compact(keep=2) == 60
+    assert profile.log.first == 60
+    assert len(profile.log.segments()) == 2
+    assert profile.stats.check(profile.log) == []
+    assert profile.leaderboard.check(profile.log) == []
+
+    profile.stats.rebuild(profile.log)
+    profile.leaderboard.rebuild(profile.log)
+    assert profile.stats.to_dict() == stats
+    assert profile.leaderboard.top() == top
+
+def test_rotation_compacts_past_keep_archives(tmp_path, monkeypatch):
+    monkeypatch.setattr(rps_profiles, "KEEP_ARCHIVES", 2)
+    profile = ProfileStore(str(tmp_path)).open("Tester")
+    play_segments(profile, 5)
+    assert len(profile.log.segments()) == 5
+    profile.rotated()
+    assert len(profile.log.segments()) == 2
+    assert profile.stats.rounds == len(profile.log) == 100
+    assert profile.stats.check(profile.log) == []
+
+def test_compact_refuses_missing_summary(tmp_path):
+    profile = ProfileStore(str(tmp_path)).open("Tester")
+    play_segments(profile, 3)
+    profile.compact(keep=1)
+    os.remove(os.path.join(profile.log.archive_dir, rps_profiles.COMPACTED_STATS_FILE))
+    play_segments(profile, 1)
+    with pytest.raises(ValueError):
+        profile.compact(keep=1)
+    assert profile.log.first == 40
+    with pytest.raises(ValueError):
+        profile.stats.rebuild(profile.log)
+
+def test_names_that_slug_alike_get_separate_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    assert store.path("Dan!") != store.path("Dan?")
@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from rps_log import GameLog
+from rps_query import DRAW, LOSE, WIN, group_by, rolling_win_rate, scan, totals, transitions
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+
+def at(day, hour, minute=0):
+    return datetime(2025, 3, day, hour, minute).timestamp()
+
+def record(timestamp, p, result, mode=0):
+    return (timestamp, p, 0, result, mode, 0, 0, 0)
+
+def test_group_by_day_and_hour():
+    records = [record(at(1, 9), ROCK, WIN), record(at(1, 9, 30), ROCK, LOSE), record(at(1, 23, 59), ROCK, WIN),
+               record(at(3, 0), ROCK, DRAW)]
+    days = [(datetime.fromtimestamp(start).day, tally.counts) for start, tally in group_by(records, "day")]
+    assert days == [(1, [0, 2, 1]), (3, [1, 0, 0])]
+    hours = [(datetime.fromtimestamp(start).hour, tally.rounds) for start, tally in group_by(records, "hour")]
+    assert hours == [(9, 2), (23, 1), (0, 1)]
+
+def test_group_by_rejects_unknown_period():
+    with pytest.raises(ValueError):
+        list(group_by([], "week"))
+
+def test_transitions():
+    moves = [(ROCK, WIN), (ROCK, LOSE), (PAPER, WIN), (SCISSORS, DRAW), (ROCK, WIN)]
+    records = [record(float(i), p, result) for i, (p, result) in enumerate(moves)]
+    matrix = transitions(records)
+    assert matrix[ROCK][ROCK] == 1 and matrix[ROCK][PAPER] == 1
+    assert matrix[PAPER][SCISSORS] == 1 and matrix[SCISSORS][ROCK] == 1
+    assert sum(map(sum, matrix)) == 4
+    by_result = transitions(records, by_result=True)
+    # After a win the player stayed once (rock) and shifted once (paper to scissors).
+    assert by_result["You Win"][ROCK][ROCK] == 1
+    assert sum(map(sum, by_result["You Win"])) == 2
+    assert by_result["You Lose"][ROCK][PAPER] == 1
+    assert by_result["Draw"][SCISSORS][ROCK] == 1
+
+def test_rolling_win_rate():
+    records = [record(float(i), ROCK, result) for i, result in enumerate([WIN, LOSE, WIN, WIN])]
+    assert [rate for _, rate in rolling_win_rate(records, window=2)] == [100.0, 50.0, 50.0, 100.0]
+
+def test_scan_by_time_and_mode(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    log.write_records([record(1000.0 + i, ROCK, WIN if i % 2 else LOSE, mode=i % 3) for i in range(30)])
+    assert totals(scan(log, since=1010.0, until=1020.0)).rounds == 10
+    assert totals(scan(log, mode="Hard")).rounds == 10
+    assert totals(scan(log)).wins == 15
@@ -0,0 +1,33 @@
+from rps_engine import Match
+from rps_log import GameLog, NO_MODE
+from rps_replay import replay
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+WIN_ROUND, DRAW_ROUND = (ROCK, SCISSORS), (ROCK, ROCK)
+
+def play(log, match, rounds):
+    for p, c in rounds:
+        result = match.score_round(p, c)
+        log.write_records([(0.0, p, c, result, NO_MODE, match.scores["player"], match.scores["computer"],
+                            match.win_streak)])
+
+def test_power_up_survives_draw_from_any_start(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    play(log, Match(), [WIN_ROUND, WIN_ROUND, WIN_ROUND, DRAW_ROUND, WIN_ROUND])
+    assert log.record(4)[5] == 5
+    for start in range(5):
+        report = replay(log, start=start)
+        assert report.ok, start
+
+def test_marked_sessions(tmp_path):
+    # Both games end 1-0, so only the markers can tell them apart.
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    match = Match()
+    for _ in range(2):
+        log.mark_session()
+        match.reset()
+        play(log, match, [WIN_ROUND])
+    report = replay(log)
+    assert report.sessions == 2
+    assert report.ok
+    assert report.logged_points == [2, 0]
@@ -0,0 +1,42 @@
+import json
+import pytest
+from rps_rules import CLASSIC, DRAW, LOSE, RPSLS, WIN, cyclic, from_dict, load_variant
+
+def test_classic_table():
+    rock, paper, scissors = (CLASSIC.codes[m] for m in ("rock", "paper", "scissors"))
+    assert CLASSIC.result(rock, scissors) == WIN
+    assert CLASSIC.result(rock, paper) == LOSE
+    assert CLASSIC.result(paper, paper) == DRAW
+    assert CLASSIC.counters[rock] == [paper]
+    assert CLASSIC.victims[rock] == [scissors]
+
+def test_cyclic_matches_hand_written_variants():
+    assert cyclic("RPS", ["rock", "paper", "scissors"]).outcome == CLASSIC.outcome
+    big = cyclic("Nine", [str(i) for i in range(9)])
+    assert big.balanced
+    assert all(len(row) == 4 for row in big.counters)
+
+@pytest.mark.parametrize("moves", [[], ["a"], ["a", "b"], ["a", "b", "c", "d"]])
+def test_cyclic_needs_an_odd_number_of_moves(moves):
+    with pytest.raises(ValueError):
+        cyclic("Bad", moves)
+
+@pytest.mark.parametrize("beats", [
+    {"a": ["b"], "b": ["c"]},                   # neither of a and c beats the other
+    {"a": ["b"], "b": ["a", "c"], "c": ["a"]},  # a and b both win
+    {"a": ["b"], "b": ["c"], "c": ["x"]},       # unknown move
+])
+def test_rejects_inconsistent_rules(beats):
+    with pytest.raises(ValueError):
+        from_dict({"name": "Bad", "moves": ["a", "b", "c"], "beats": beats})
+
+def test_rejects_repeated_moves():
+    with pytest.raises(ValueError):
+        from_dict({"name": "Bad", "cyclic": ["a", "b", "a"]})
+
+def test_load_variant(tmp_path):
+    path = tmp_path / "rpsls.json"
+    path.write_text(json.dumps({"name": RPSLS.name, "moves": RPSLS.moves,
+                                "beats": {m: [RPSLS.moves[c] for c in RPSLS.victims[p]]
+                                          for p, m in enumerate(RPSLS.moves)}}))
+    assert load_variant(str(path)).outcome == RPSLS.outcome
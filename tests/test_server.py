@@ -0,0 +1,103 @@
+import asyncio
+import json
+from rps_server import MatchServer, encode
+
+# Client connections, closed after each test.
+clients = []
+
+async def connect(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    clients.append(writer)
+
+    async def send(msg):
+        writer.write(encode(msg))
+        await writer.drain()
+
+    async def receive():
+        return json.loads(await asyncio.wait_for(reader.readline(), 5))
+    return send, receive
+
+def run(test, **server_args):
+    async def main():
+        server = MatchServer(**server_args)
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        async with listener:
+            try:
+                await test(listener.sockets[0].getsockname()[1])
+            finally:
+                for writer in clients:
+                    writer.close()
+                    await writer.wait_closed()
+                clients.clear()
+    asyncio.run(main())
+
+async def duel(port, notify_commit=False):
+    a_send, a_receive = await connect(port)
+    b_send, b_receive = await connect(port)
+    await a_send({"op": "join", "name": "a"})
+    assert (await a_receive())["op"] == "waiting"
+    await b_send({"op": "join", "name": "b", "notify_commit": notify_commit})
+    assert (await a_receive())["opponent"] == "b"
+    assert (await b_receive())["opponent"] == "a"
+    return (a_send, a_receive), (b_send, b_receive)
+
+def test_moves_are_hidden_until_both_commit():
+    async def test(port):
+        (a_send, a_receive), (b_send, b_receive) = await duel(port, notify_commit=True)
+        await a_send({"op": "move", "round": 1, "move": "rock"})
+        # b only learns that a has moved.
+        assert await b_receive() == {"op": "committed", "round": 1}
+        await b_send({"op": "move", "round": 1, "move": "scissors"})
+        a_result, b_result = await a_receive(), await b_receive()
+        assert (a_result["result"], a_result["opponent"], a_result["score"]) == ("You Win", "scissors", 1)
+        assert (b_result["result"], b_result["opponent"], b_result["opponent_score"]) == ("You Lose", "rock", 1)
+    run(test)
+
+def test_rejects_wrong_round_and_second_move():
+    async def test(port):
+        (a_send, a_receive), _ = await duel(port)
+        await a_send({"op": "move", "round": 2, "move": "rock"})
+        assert (await a_receive())["error"] == "expected round 1"
+        await a_send({"op": "move", "round": 1, "move": "rock"})
+        await a_send({"op": "move", "round": 1, "move": "paper"})
+        assert (await a_receive())["error"] == "move already committed"
+    run(test)
+
+def test_duel_timeout_forfeits_the_player_who_did_not_move():
+    async def test(port):
+        (a_send, a_receive), (_, b_receive) = await duel(port)
+        await a_send({"op": "move", "round": 1, "move": "rock"})
+        a_end, b_end = await a_receive(), await b_receive()
+        assert (a_end["reason"], a_end["winner"]) == ("timeout", True)
+        assert (b_end["reason"], b_end["winner"]) == ("timeout", False)
+    run(test, move_timeout=0.2)
+
+def test_solo_match_and_timeout():
+    async def test(port):
+        send, receive = await connect(port)
+        await send({"op": "join", "mode": "Easy"})
+        assert (await receive())["opponent"] == "computer (Easy)"
+        await send({"op": "move", "round": 1, "move": "rock"})
+        assert (await receive())["op"] == "result"
+        end = await receive()
+        assert (end["op"], end["reason"], end["winner"]) == ("end", "timeout", False)
+    run(test, move_timeout=0.2)
+
+def test_match_ends_after_rounds():
+    async def test(port):
+        send, receive = await connect(port)
+        await send({"op": "join", "mode": "Hard"})
+        await receive()
+        for round_no in (1, 2):
+            await send({"op": "move", "round": round_no, "move": "paper"})
+            assert (await receive())["round"] == round_no
+        assert (await receive())["reason"] == "complete"
+    run(test, rounds=2)
+
+def test_leaving_forfeits_a_duel():
+    async def test(port):
+        (a_send, a_receive), (_, b_receive) = await duel(port)
+        await a_send({"op": "leave"})
+        assert (await a_receive())["winner"] is False
+        assert (await b_receive())["winner"] is True
+    run(test)
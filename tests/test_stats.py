@@ -0,0 +1,51 @@
+import random
+from rps_log import NO_MODE, GameLog
+from rps_stats import GameStats
+
+def random_records(n, seed=1):
+    rng = random.Random(seed)
+    return [(1000.0 + i, rng.randrange(3), rng.randrange(3), rng.randrange(3), rng.choice([0, 1, 2, NO_MODE]),
+             0, 0, 0) for i in range(n)]
+
+def test_incremental_matches_rebuild(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    records = random_records(5000)
+    log.write_records(records)
+    stats = GameStats()
+    for record in records:
+        stats.add_record(record)
+    rebuilt = GameStats()
+    rebuilt.rebuild(log)
+    assert stats.to_dict() == rebuilt.to_dict()
+    assert stats.check(log) == []
+    assert stats.total_games == stats.wins + stats.losses + stats.draws == 5000
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "game_stats.json")
+    stats = GameStats(path)
+    for record in random_records(100):
+        stats.add_record(record)
+    stats.save()
+    assert GameStats(path).to_dict() == stats.to_dict()
+
+def test_sync_catches_up_after_a_crash(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    records = random_records(300)
+    stats = GameStats()
+    for record in records[:200]:
+        stats.add_record(record)
+    log.write_records(records)
+    stats.sync(log)
+    assert stats.rounds == 300
+    assert stats.check(log) == []
+
+def test_sync_rebuilds_stats_ahead_of_the_log(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    records = random_records(50)
+    stats = GameStats()
+    for record in records:
+        stats.add_record(record)
+    log.write_records(records[:20])
+    stats.sync(log)
+    assert stats.rounds == 20
+    assert stats.check(log) == []
@@ -0,0 +1,11 @@
+import pytest
+from rps_tournament import Standings, round_robin
+
+def test_rejects_duplicate_strategies():
+    with pytest.raises(ValueError):
+        Standings(["easy", "hard", "easy"])
+
+def test_results_do_not_depend_on_workers():
+    one = round_robin(["easy", "hard", "adaptive"], games=6, rounds=50, seed=3, workers=1)
+    two = round_robin(["easy", "hard", "adaptive"], games=6, rounds=50, seed=3, workers=2)
+    assert one.table == two.table
@@ -0,0 +1,61 @@
+import os
+import time
+from rps_log import GameLog, LogWriter
+
+def append(writer, n):
+    for i in range(n):
+        writer.append("rock", "scissors", "You Win", "Easy", i + 1, 0, i + 1, 1000.0 + i)
+
+def test_flush_writes_pending_rounds(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    batches = []
+    writer = LogWriter(log, batch_size=100, max_delay=60, on_commit=batches.append)
+    append(writer, 5)
+    writer.flush()
+    assert len(log) == 5
+    assert [len(b) for b in batches] == [5]
+    writer.close()
+
+def test_groups_rounds_into_batches(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    batches = []
+    writer = LogWriter(log, batch_size=4, max_delay=60, on_commit=batches.append)
+    append(writer, 10)
+    writer.close()
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert [r[0] for r in log.iter_records()] == [1000.0 + i for i in range(10)]
+
+def test_commits_after_max_delay(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    writer = LogWriter(log, batch_size=100, max_delay=0.05)
+    append(writer, 3)
+    deadline = time.monotonic() + 5
+    while len(log) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(log) == 3
+    writer.close()
+
+def test_fsync_every(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (synced.append(fd), fsync(fd)))
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    writer = LogWriter(log, batch_size=2, max_delay=60, fsync_every=4)
+    append(writer, 4)
+    writer.flush()
+    assert len(synced) == 1
+    append(writer, 1)
+    writer.flush()
+    # A flush always syncs when fsync is on.
+    assert len(synced) == 2
+    writer.close()
+
+def test_session_marks_follow_pending_rounds(tmp_path):
+    log = GameLog(str(tmp_path / "game_log.bin"))
+    writer = LogWriter(log, batch_size=100, max_delay=60)
+    append(writer, 3)
+    writer.start_session()
+    append(writer, 2)
+    writer.close()
+    assert log.session_starts() == [3]
+    assert len(log) == 5